@@ -1,15 +1,63 @@
-from helper import logger, date_range
-from JiraWrapper import JiraWrapper
+from helper import logger, date_range, percentile, full_rt, csv_lines
+import metrics
+from JiraWrapper import JiraWrapper, VALID_BOARD_MODELS
 from issueWrapper import Story, Task, Epic
-from datetime import datetime, timedelta
+from statusCounts import EpicStatusCounts
+from searchIndex import TextSearchIndex
+from timelineEvents import TimelineBroadcaster
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import bisect, threading
 
 #-----------------------------------------------------------------------------------------------------------
 # JiraClient Class
 #-----------------------------------------------------------------------------------------------------------
 
+# fields of the board query inverted indexes, and the dates boards can be filtered on
+BOARD_QUERY_FIELDS = ("board_model", "status", "assignee", "epic_key")
+BOARD_DATE_FIELDS = ("created", "status_changed")
+
+# upper bounds in hours of the dwell time histogram buckets, the last bucket is unbounded
+DWELL_HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 24, 48, 72, 120, 168, 336)
+
+ORDER_SUMMARY_LABELS = {
+    "rt_num": "Epic Key",
+    "summary": "Summary",
+    "created": "Created Date",
+    "board_count": "Boards",
+    'chassis_count': "Chassis",
+    'is_closed': "Order State",
+    'status_counts': "Status Counts",
+    'first_date': "Start Date",
+    'last_date': "Close Date",
+    'day_count': "Days",
+    'process_rate': "per Day"
+}
+ORDER_SUMMARY_COLUMNS = [
+    "rt_num",
+    "created",
+    "summary",
+    "board_count",
+    "chassis_count",
+    "first_date",
+    "last_date",
+    "day_count",
+    "process_rate",
+    "is_closed",
+    "status_counts"
+]
+
+# one CSV column per status get_board_counts reports, ERROR says how many boards are missing from them
+CSV_STATUS_COUNTS = ("Passed Initial Diagnosis", "Awaiting Functional Test", "Scrap", "ERROR")
+CSV_EVENT_HEADER = (
+    "Issue Key", "Serial", "Assignee", "Board Model", "Repair Summary", "Last Update",
+    "Event", "Event Time", "From", "To", "Time in Status", "Author", "Comment"
+)
+
+
 class JiraClient(JiraWrapper):
     def __init__(self):
-        super().__init__()
+        # business hours are computed while the epics are indexed, so the calendar must be set first
         self.holidays = [
             "2025-01-01",  # New Year's Day
             "2025-01-20",  # MLK Jr. Day
@@ -23,6 +71,25 @@ class JiraClient(JiraWrapper):
             "2025-11-27",  # Thanksgiving
             "2025-12-25"   # Christmas
         ]
+        self.holiday_dates = {datetime.strptime(holiday, "%Y-%m-%d").date() for holiday in self.holidays}
+        self.business_day_hours = (8, 17) # shop hours used for business hour durations
+
+        # indexes are filled by on_epic_loaded while JiraWrapper loads the epics, so they must exist first
+        self.serial_index = {} # serial -> {issue key -> board entry}, tasks of every loaded epic, also the board lifecycle
+        self.dwell_index = {} # epic key -> {issue key -> [(status, wall hours, business hours), ...]}, tasks only
+        self.status_counts = {} # epic key -> EpicStatusCounts, the day x status counts of the timeline
+        self.board_records = {} # issue key -> board record, tasks of every loaded epic
+        self.board_field_index = {field: {} for field in BOARD_QUERY_FIELDS} # field -> value -> set of issue keys
+        self.board_date_index = {field: [] for field in BOARD_DATE_FIELDS} # field -> sorted [(day ordinal, issue key)]
+        self.board_index_lock = threading.Lock()
+        self.workload_index = {} # technician -> {day ordinal -> {status -> transitions into it}}, tasks only
+        self.workload_contributions = {} # issue key -> (epic key, [(technician, day ordinal, status), ...])
+        self.workload_lock = threading.Lock()
+        self.text_index = TextSearchIndex() # comment text and repair summary of every loaded issue
+        self.timeline_events = TimelineBroadcaster() # count timeline changes pushed to the open dashboards
+        self.pending_status_changes = {} # epic key -> (old, new) issue pairs of loads not published to the streams yet
+
+        super().__init__()
 
     def calculate_business_days(self, start_date, end_date):
         """Calculate number of business days between two dates, excluding weekends and federal holidays."""
@@ -53,17 +120,37 @@ class JiraClient(JiraWrapper):
         
         return business_days
 
+    def calculate_business_hours(self, start_time, end_time):
+        """Calculate the number of business hours between two datetimes, only counting shop hours on business days."""
+        if not start_time or not end_time or end_time <= start_time:
+            return 0.0
+
+        holiday_dates = self.holiday_dates
+        open_hour, close_hour = self.business_day_hours
+        end_time = end_time.astimezone(start_time.tzinfo) if start_time.tzinfo else end_time
+        total_seconds = 0.0
+
+        for day in date_range(start_time, end_time):
+            if day.weekday() >= 5 or day in holiday_dates:
+                continue
+            day_open = datetime.combine(day, datetime.min.time(), tzinfo=start_time.tzinfo).replace(hour=open_hour)
+            day_close = day_open.replace(hour=close_hour)
+            overlap = (min(end_time, day_close) - max(start_time, day_open)).total_seconds()
+            if overlap > 0:
+                total_seconds += overlap
+
+        return total_seconds / 3600
+
     def get_all_rt_epics(self):
         #returns json object for front-end order selection
         epic_list = []
 
-        for epic_key in self.epics:
-            epic = self.epics[epic_key]
+        for epic in self.epics.values():
             epic_list.append({
                 "rt_num": epic.key,
                 "summary": epic.title,
                 "created": epic.start_date,
-                "is_closed": self.is_order_closed(epic_key),
+                "is_closed": self.is_order_closed(epic),
                 "issue_count": len(epic.tasks)
             })
 
@@ -74,16 +161,16 @@ class JiraClient(JiraWrapper):
         return self.epics[epic_key].to_dict()
     
 
-    def get_serial_from_key_and_epic(self, issue_key, epic_key):
+    def get_serial_from_key_and_epic(self, issue_key, epic):
         issue = None
 
-        for check_issue in self.epics[epic_key].tasks:
+        for check_issue in epic.tasks:
             if check_issue.key == issue_key:
                 issue = check_issue
                 break
 
         if issue is None: #check stories if its not found in tasks
-            for check_issue in self.epics[epic_key].stories:
+            for check_issue in epic.stories:
                 if check_issue.key == issue_key:
                     issue = check_issue
                     break
@@ -96,23 +183,34 @@ class JiraClient(JiraWrapper):
 
     def create_issue_summary_by_serial_from_epic(self, serial, epic_key):
         issue = None
+        epic = self.epics[epic_key]
 
-        for check_issue in self.epics[epic_key].tasks:
+        for check_issue in epic.tasks:
             if check_issue.serial == serial:
                 issue = check_issue
                 break
 
         if issue is None: #check stories if its not found in tasks
-            for check_issue in self.epics[epic_key].stories:
+            for check_issue in epic.stories:
                 if check_issue.serial == serial:
                     issue = check_issue
                     break
-        
-        return self.create_issue_summary(issue, epic_key)
 
+        summary = self.create_issue_summary(issue, epic)
+
+        # only the single board view shows the other orders of the board, the bulk summaries leave them out.
+        # they change with every epic load, so they stay out of the cached summary
+        if issue is not None and issue.type == "Task" and issue.serial:
+            summary["board_history"] = [
+                appearance for appearance in self.get_board_lifecycle(issue.serial)["appearances"]
+                if appearance["issue_key"] != issue.key
+            ]
+        return summary
 
-    def create_issue_summary(self, issue, epic_key):
+
+    def create_issue_summary(self, issue, epic):
         #compiles hashboard data, repair summary, status changes, and comments for display on the front end.
+        #the summary is built once per issue and cached on it, callers get a copy they are free to modify
         
         if issue is None:
             return {   
@@ -124,86 +222,63 @@ class JiraClient(JiraWrapper):
             "events": []
         }       
 
+        if issue.summary_cache is None:
+            metrics.issue_summary_cache.inc(result="miss")
+            issue.summary_cache = self._build_issue_summary(issue, epic)
+        else:
+            metrics.issue_summary_cache.inc(result="hit")
+
+        # the values are flat apart from the event dicts and linked serials, copying those keeps the cache intact
+        summary = dict(issue.summary_cache)
+        summary["events"] = [dict(event) for event in summary["events"]]
+        if "linked_issues" in summary:
+            summary["linked_issues"] = list(summary["linked_issues"])
+
+        return summary
+
+
+    def _build_issue_summary(self, issue, epic):
         events = []
 
-        # add the status changes to events
-        for status_change in issue.status_history:
+        # add the status changes to events, durations were computed when the issue was loaded
+        for status_change, length in zip(issue.status_history, issue.status_lengths):
             events.append({
                 "type": "status_change",
                 "from": status_change.from_status,
                 "to": status_change.to_status,
                 "time": status_change.timestamp,
-                "length": None,
+                "length": length,
                 "author": status_change.author
             })
 
-        # sort events chronologically, so we can calc status lengths properly
-        events.sort(key=lambda x: x["time"])
-
-        # calc status time durations
-        for i, event in enumerate(events):
-            if event["type"] == "status_change":
-                next_status_time = None
-                for j in range(i + 1, len(events)):
-                    if events[j]["type"] == "status_change":
-                        next_status_time = events[j]["time"]
-                        break
-                if next_status_time:
-                    duration = next_status_time - event["time"]
-                    total_minutes = int(duration.total_seconds() // 60)
-                    hours, minutes = divmod(total_minutes, 60)
-                    event["length"] = f"{hours:01}h {minutes:02}m"
-                else:
-                    event["length"] = "Current Status"  # Final status, no next one
-                
-
-        # add comments to events
+        # add comments to events, the plain text body was extracted when the issue was loaded
         for comment in issue.comments:
             events.append({
                 "type": "comment",
                 "author": comment.author,
                 "time": comment.timestamp,
-                "body": comment.body
+                "body": comment.text
             })
 
         # sort events chronologically
         events.sort(key=lambda x: x["time"])
 
-        filtered_events = []
-
-        #filter events / set flags
         for event in events:
-
             event['time'] = event['time'].strftime("%Y-%m-%d %H:%M")
-            if event['type'] == "status_change":
-                filtered_events.append(event)
-
-
-            if event['type'] == "comment":
-                # Handle both string and dict comment bodies
-                if isinstance(event['body'], str):
-                    event['body'] = event['body'].replace("\n", "-")
-                elif isinstance(event['body'], dict):
-                    # For v3 API, comment body might be in document format
-                    # Extract plain text from the structure
-                    event['body'] = self._extract_comment_text(event['body'])
-                else:
-                    event['body'] = str(event['body']).replace("\n", "-")
-                filtered_events.append(event)
 
         result = {
             "serial": issue.serial,
             "rt_num": issue.key,
             "assignee": issue.assignee,
             "repair_summary": issue.repair_summary.replace('\n', '-') if issue.repair_summary else 'N/A',
-            "events": filtered_events
+            "events": events
         }
 
         if issue.type == "Story":
             serial_list = []
 
             for linked_issue in issue.linked_issues:
-                serial_list.append(self.get_serial_from_key_and_epic(linked_issue, epic_key))
+                serial_list.append(self.get_serial_from_key_and_epic(linked_issue, epic))
 
             result["linked_issues"] = serial_list
         else:
@@ -211,162 +286,611 @@ class JiraClient(JiraWrapper):
 
         return result
 
-    def _extract_comment_text(self, comment_body):
-        """Extract plain text from Jira v3 API comment body structure"""
-        if isinstance(comment_body, str):
-            return comment_body.replace("\n", "-")
-        
-        if isinstance(comment_body, dict):
-            # Jira v3 uses document format for rich text
-            if 'content' in comment_body:
-                text_parts = []
-                for content_item in comment_body.get('content', []):
-                    if content_item.get('type') == 'paragraph':
-                        for paragraph_content in content_item.get('content', []):
-                            if paragraph_content.get('type') == 'text':
-                                text_parts.append(paragraph_content.get('text', ''))
-                return ' '.join(text_parts).replace("\n", "-")
-            # Fallback to string representation
-            return str(comment_body).replace("\n", "-")
-        
-        return str(comment_body).replace("\n", "-") 
-
 
     def get_issue_summary_from_epic(self, epic_key):
-        issue_list = []
+        #yields the summaries ordered by their last event, only the sort keys are held so the first one comes out right away
+        epic = self.epics[epic_key]
 
-        for issue in self.epics[epic_key].tasks:
-            last_timestamp = None
-            summary = self.create_issue_summary(issue, epic_key)
-            for event in summary['events']:
-                last_timestamp = event['time']
+        # boards without a status change or comment, like a new one from a webhook, have no time and come last
+        ordered = sorted(((self.last_event_time(issue), issue) for issue in epic.tasks), key=lambda x: (x[0] is None, x[0] or ""))
+        for last_timestamp, issue in ordered:
+            summary = self.create_issue_summary(issue, epic)
             summary['time'] = last_timestamp
-            issue_list.append(summary)
+            yield summary
 
-        issue_list.sort(key=lambda x: x["time"])
-        for issue in issue_list:
-            yield issue
+
+    def last_event_time(self, issue):
+        #time of the last event of the issue summary, without building it
+        timestamps = [change.timestamp for change in issue.status_history] + [comment.timestamp for comment in issue.comments]
+        return max(timestamps).strftime("%Y-%m-%d %H:%M") if timestamps else None
 
 
     def get_repair_data_from_epic(self, epic_key):
         # filters repair status and comments using create_issue_summary
         # yields only issues that passed through Advanced Repair & Awaiting Functional Test, and were NOT scrapped
-        
-        issue_list = []
+        epic = self.epics[epic_key]
+
+        # the first pass only keeps the sort keys, the summaries are cached so building them again is cheap
+        ordered = []
+        for issue in epic.tasks:
+            repair_events = self.filter_repair_events(self.create_issue_summary(issue, epic)["events"])
+            if repair_events is not None:
+                ordered.append((repair_events[1], issue))
+        ordered.sort(key=lambda x: (x[0] is None, x[0] or ""))
+
+        for last_timestamp, issue in ordered:
+            summary = self.create_issue_summary(issue, epic)
+            summary["time"] = last_timestamp
+            summary['events'] = self.filter_repair_events(summary["events"])[0]
+            yield summary
+
+
+    def filter_repair_events(self, events):
+        #returns (repair status changes and comments, time of the last one), None if the board was not repaired or was scrapped
         image_extensions = (".png", ".jpeg", ".jpg") #skip comments with images
 
-        for issue in self.epics[epic_key].tasks:
-            summary = self.create_issue_summary(issue, epic_key)
-            events = summary["events"]
-
-            advanced_repair = False
-            awaiting_functional_test = False
-            scrap = False
-            last_timestamp = None
-
-            filtered_events = []
-
-            for event in events:
-                if event['type'] == "status_change":
-                    if event['to'] == "Advanced Repair":
-                        filtered_events.append(event)
-                        advanced_repair = True
-                        last_timestamp = event['time']
-                    elif event['to'] == "Awaiting Functional Test":
-                        filtered_events.append(event)
-                        awaiting_functional_test = True
-                        last_timestamp = event['time']
-                    elif event['to'] == "Scrap":
-                        scrap = True
-                elif event['type'] == "comment":
-                    if not any(ext in event["body"] for ext in image_extensions):
-                        filtered_events.append(event)
-                        last_timestamp = event['time']
-
-            if advanced_repair and awaiting_functional_test and not scrap:
-                summary["time"] = last_timestamp
-                summary['events'] = filtered_events
-                issue_list.append(summary)
-
-        issue_list.sort(key=lambda x: x["time"])
-        for issue in issue_list:
-            yield issue
-            
+        advanced_repair = False
+        awaiting_functional_test = False
+        scrap = False
+        last_timestamp = None
 
+        filtered_events = []
 
-    def update_jira_with_board_data(self, board_data):
-        # function for updating the board data scraped from the arc tester
+        for event in events:
+            if event['type'] == "status_change":
+                if event['to'] == "Advanced Repair":
+                    filtered_events.append(event)
+                    advanced_repair = True
+                    last_timestamp = event['time']
+                elif event['to'] == "Awaiting Functional Test":
+                    filtered_events.append(event)
+                    awaiting_functional_test = True
+                    last_timestamp = event['time']
+                elif event['to'] == "Scrap":
+                    scrap = True
+            elif event['type'] == "comment":
+                if not any(ext in event["body"] for ext in image_extensions):
+                    filtered_events.append(event)
+                    last_timestamp = event['time']
+
+        if advanced_repair and awaiting_functional_test and not scrap:
+            return filtered_events, last_timestamp
+        return None
 
-        valid_board_models = [
-            "NBS1906",
-            "BHB42831",
-            "NBP1901",
-            "BHB42603",
-            "BHB42631",
-            "BHB42841",
-            "BHB42601",
-            "BHB56801",
-            "BHB42621",
-            "BHB42651",
-            "BHB56903",
-            "BHB68606",
-            "BHB68603",
-            "A3HB70601",
-            "BHB68701",
-            "BHB68703"
+
+#-----------------------------------------------------------------------------------------------------------
+# CSV Export Functions
+#-----------------------------------------------------------------------------------------------------------
+
+    def order_summaries_csv(self):
+        #one line per epic, written as each order summary is computed
+        columns = [column for column in ORDER_SUMMARY_COLUMNS if column != "status_counts"]
+        header = [ORDER_SUMMARY_LABELS[column] for column in columns] + [
+            f"{ORDER_SUMMARY_LABELS['status_counts']}: {status}" for status in CSV_STATUS_COUNTS
         ]
 
+        def rows():
+            for summary in self.iter_order_summaries():
+                status_counts = summary["status_counts"]
+                yield [summary[column] for column in columns] + [status_counts.get(status, "") for status in CSV_STATUS_COUNTS]
+
+        return csv_lines(header, rows())
+
+
+    def issue_summaries_csv(self, epic_key):
+        return csv_lines(CSV_EVENT_HEADER, self.summary_event_rows(self.get_issue_summary_from_epic(epic_key)))
+
+
+    def repair_data_csv(self, epic_key):
+        return csv_lines(CSV_EVENT_HEADER, self.summary_event_rows(self.get_repair_data_from_epic(epic_key)))
+
+
+    def summary_event_rows(self, summaries):
+        #one row per event of every issue summary, an issue without events still gets one row
+        for summary in summaries:
+            issue = [
+                summary["rt_num"], summary["serial"], summary["assignee"], summary.get("board_model", ""),
+                summary["repair_summary"], summary["time"]
+            ]
+            if not summary["events"]:
+                yield issue
+            for event in summary["events"]:
+                yield issue + [
+                    event["type"], event["time"], event.get("from", ""), event.get("to", ""),
+                    event.get("length", ""), event["author"], event.get("body", "")
+                ]
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Repair Analytics Functions
+#-----------------------------------------------------------------------------------------------------------
+
+    def get_repair_durations(self, issue, business_hours=False):
+        #returns (technician, hours) for every Advanced Repair -> Awaiting Functional Test cycle of the issue
+        #the technician is whoever moved the board into Advanced Repair, scrapped boards have no repair cycles
+        if any(change.to_status == "Scrap" for change in issue.status_history):
+            return []
+
+        durations = []
+        repair_start = None
+
+        for change in issue.status_history:
+            if change.to_status == "Advanced Repair" and repair_start is None:
+                repair_start = change
+            elif change.to_status == "Awaiting Functional Test" and repair_start is not None:
+                if business_hours:
+                    hours = self.calculate_business_hours(repair_start.timestamp, change.timestamp)
+                else:
+                    hours = (change.timestamp - repair_start.timestamp).total_seconds() / 3600
+                durations.append((repair_start.author, hours))
+                repair_start = None
+
+        return durations
+
+    def get_repair_analytics(self, epic_key=None, business_hours=False):
+        #aggregates repair durations per technician and per board model, for one epic or every loaded epic
+        epics = [self.epics[epic_key]] if epic_key else list(self.epics.values())
+
+        all_hours = []
+        by_technician = {}
+        by_board_model = {}
+
+        for epic in epics:
+            for issue in epic.tasks:
+                board_model = issue.board_model if issue.board_model else 'N/A'
+                for technician, hours in self.get_repair_durations(issue, business_hours):
+                    all_hours.append(hours)
+                    by_technician.setdefault(technician, []).append(hours)
+                    by_board_model.setdefault(board_model, []).append(hours)
+
+        return {
+            "rt_num": epic_key,
+            "business_hours": business_hours,
+            "unit": "hours",
+            "overall": self._summarize_durations(all_hours),
+            "by_technician": {name: self._summarize_durations(hours) for name, hours in sorted(by_technician.items())},
+            "by_board_model": {model: self._summarize_durations(hours) for model, hours in sorted(by_board_model.items())}
+        }
+
+    def _summarize_durations(self, hours):
+        hours = sorted(hours)
+        return {
+            "count": len(hours),
+            "median": round(percentile(hours, 50), 2) if hours else None,
+            "p90": round(percentile(hours, 90), 2) if hours else None
+        }
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Dwell Analytics Functions
+#-----------------------------------------------------------------------------------------------------------
+
+    def compute_dwell_intervals(self, issue):
+        #returns (status, wall hours, business hours) for every completed stay of the issue in a status
+        #the first stay starts when the issue was created, the current status is still open and left out
+        intervals = []
+        status = issue.status_history[0].from_status if issue.status_history else None
+        entered = issue.created
+
+        for change in issue.status_history:
+            if status is not None and change.timestamp >= entered:
+                intervals.append((
+                    status,
+                    (change.timestamp - entered).total_seconds() / 3600,
+                    self.calculate_business_hours(entered, change.timestamp)
+                ))
+            status = change.to_status
+            entered = change.timestamp
+
+        return intervals
+
+    def get_dwell_analytics(self, epic_key=None, statuses=None, business_hours=False):
+        #distribution of the time boards stay in each status, for one epic or every loaded epic
+        dwell_index = self.dwell_index
+        epic_keys = [epic_key] if epic_key else list(dwell_index.keys())
+        column = 2 if business_hours else 1
+
+        hours_by_status = {}
+        for key in epic_keys:
+            for intervals in list(dwell_index.get(key, {}).values()):
+                for interval in intervals:
+                    if statuses is None or interval[0] in statuses:
+                        hours_by_status.setdefault(interval[0], []).append(interval[column])
+
+        return {
+            "rt_num": epic_key,
+            "business_hours": business_hours,
+            "unit": "hours",
+            "statuses": {status: self._summarize_dwell(hours) for status, hours in sorted(hours_by_status.items())}
+        }
+
+    def _summarize_dwell(self, hours):
+        hours = sorted(hours)
+        histogram = []
+        start = 0
+        for bound in DWELL_HISTOGRAM_BUCKETS + (float("inf"),):
+            end = bisect.bisect_right(hours, bound, lo=start)
+            histogram.append({"le": bound if bound != float("inf") else "+Inf", "count": end - start})
+            start = end
+
+        return {
+            "count": len(hours),
+            "mean": round(sum(hours) / len(hours), 2),
+            "p50": round(percentile(hours, 50), 2),
+            "p75": round(percentile(hours, 75), 2),
+            "p90": round(percentile(hours, 90), 2),
+            "p95": round(percentile(hours, 95), 2),
+            "max": round(hours[-1], 2),
+            "histogram": histogram
+        }
+
+
+    def update_jira_with_board_data(self, board_data, search_on_miss=True):
+        # function for updating the board data scraped from the arc tester
+        # returns "updated", "unchanged", "not_found", "skipped" or "error"
+
         serial = board_data.get("serial")
         board_model = board_data.get("boardModel")
 
         if not serial:
             logger.warning("No serial number provided. Skipping.")
-            return
+            return "skipped"
 
         if not board_model:
             logger.warning(f"No board model found for serial {serial}. Skipping update.")
-            return
-
-        # JQL to find the issue by serial (assumed to be in the summary)
-        jql = f'summary ~ "{serial}" AND issuetype = Task'
+            return "skipped"
 
         try:
-            issues = list(self.search_issues(jql, batch_size=1))
-            if not issues:
+            entry = self.lookup_serial(serial)
+            if entry is None and search_on_miss:
+                entry = self.search_serial_in_jira(serial)
+            if entry is None:
                 logger.warning(f"No JIRA issue found for serial: {serial}. Skipping update.")
-                return
+                return "not_found"
 
-            issue = issues[0]
-            fields_to_update = {}
+            fields_to_update = self.get_board_fields_to_update(entry, board_data)
 
-            # Current field values
-            current_board_model = getattr(issue.fields, "customfield_10230", None)
-            current_frequency = getattr(issue.fields, "customfield_10229", None)
-            current_hashrate = getattr(issue.fields, "customfield_10153", None)
+            if not fields_to_update:
+                logger.info(f"No updates needed for {serial}")
+                return "unchanged"
 
-            # Board Model - only update if different
-            if not current_board_model or current_board_model.value != board_model:
-                if board_model in valid_board_models:
-                    fields_to_update["customfield_10230"] = {"value": board_model}
-                else:
-                    logger.warning(f"Invalid board model detected. {board_model} not in JIRA options.")
+            if not self.update_issue_fields(entry["issue_key"], fields_to_update):
+                return "error"
+
+            self.apply_board_fields_to_index(entry, fields_to_update)
+            logger.info(f"Updated {serial} with: {fields_to_update}")
+            return "updated"
 
-            # Optional: Frequency
-            if "frequency" in board_data and (not current_frequency or current_frequency.strip() != board_data["frequency"]):
-                fields_to_update["customfield_10229"] = board_data["frequency"]
+        except Exception as e:
+            logger.error(f"Error updating board data for serial {serial}: {e}")
+            return "error"
 
-            # Optional: Hashrate
-            if "hashRate" in board_data and (not current_hashrate or current_hashrate.strip() != board_data["hashRate"]):
-                fields_to_update["customfield_10153"] = board_data["hashRate"]
 
-            if fields_to_update:
-                issue.update(fields=fields_to_update)
-                logger.info(f"Updated {serial} with: {fields_to_update}")
+    def update_jira_with_board_data_batch(self, board_records, max_workers=4):
+        # updates many arc tester boards at once, returns {serial: result} using the same results as a single update
+        boards = {}
+        results = {}
+
+        for board_data in board_records:
+            serial = (board_data.get("serial") or "").strip()
+            if not serial or not board_data.get("boardModel"):
+                logger.warning(f"Missing serial or board model in batch record {board_data}. Skipping.")
+                if serial:
+                    results[serial] = "skipped"
+                continue
+            # repeated records for the same serial are merged, later values win
+            boards.setdefault(serial, {}).update(board_data, serial=serial)
+
+        # one combined lookup for every serial the index does not know yet
+        missing = [serial for serial in boards if self.lookup_serial(serial) is None]
+        if missing:
+            self.search_serials_in_jira(missing)
+
+        if not boards:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(boards))) as executor:
+            futures = {
+                executor.submit(self.update_jira_with_board_data, board_data, search_on_miss=False): serial
+                for serial, board_data in boards.items()
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        return results
+
+
+    def create_issues_if_not_exist(self, board_records):
+        # bulk version of create_issue_if_not_exists, existence is checked against the serial index and then in Jira
+        # returns {serial: {"result": "created" | "skipped" | "failed", ...}}
+        results = {}
+        boards = []
+        for board_data in board_records:
+            board_issue = self.build_board_issue_fields(board_data)
+            if board_issue is None:
+                serial = (board_data.get("serial") or "").strip()
+                if serial:
+                    results[serial] = {"result": "failed", "error": "Missing required board data fields"}
+                continue
+            boards.append(board_issue)
+
+        # the serial index only has the dumps and the creates of this worker since it started, a board created
+        # by another worker or before a restart is only in Jira, so every miss is looked up there, one search per epic
+        misses = {} # epic key -> serials the serial index does not have in that epic
+        for epic_key, serial, _ in boards:
+            if not self.serial_exists_in_epic(serial, epic_key):
+                misses.setdefault(epic_key, set()).add(serial)
+        for epic_key, serials in misses.items():
+            self.search_epic_serials_in_jira(epic_key, sorted(serials))
+
+        to_create = []
+        pending = set() # (serial, epic key) of to_create
+        for epic_key, serial, fields in boards:
+            if self.serial_exists_in_epic(serial, epic_key) or (serial, epic_key) in pending:
+                logger.info(f"Issue with serial '{serial}' already exists in epic '{epic_key}'.")
+                results[serial] = {"result": "skipped"}
+                continue
+
+            to_create.append((serial, epic_key, fields))
+            pending.add((serial, epic_key))
+
+        created_results = self.create_issues_bulk([fields for _, _, fields in to_create])
+
+        for (serial, epic_key, fields), created in zip(to_create, created_results):
+            if "key" in created:
+                logger.info(f"Created issue {created['key']} for board serial '{serial}'")
+                # index the new issue right away so the next intake or board update finds it without Jira
+                created_time = datetime.now().astimezone().strftime("%Y-%m-%dT%H:%M:%S.%f%z")
+                self.index_raw_task({"key": created["key"], "fields": dict(fields, created=created_time)})
+                results[serial] = {"result": "created", "key": created["key"]}
             else:
-                logger.info(f"No updates needed for {serial}")
+                logger.warning(f"Failed to create issue for board serial '{serial}': {created['error']}")
+                results[serial] = {"result": "failed", "error": created["error"]}
+
+        return results
+
+
+    def get_board_fields_to_update(self, entry, board_data):
+        #compares the arc tester data against the current field values of the serial index entry
+        fields_to_update = {}
+        board_model = board_data.get("boardModel")
+
+        # Board Model - only update if different
+        if entry["board_model"] != board_model:
+            if board_model in VALID_BOARD_MODELS:
+                fields_to_update["customfield_10230"] = {"value": board_model}
+            else:
+                logger.warning(f"Invalid board model detected. {board_model} not in JIRA options.")
+
+        # Optional: Frequency
+        if "frequency" in board_data and (not entry["frequency"] or entry["frequency"].strip() != board_data["frequency"]):
+            fields_to_update["customfield_10229"] = board_data["frequency"]
+
+        # Optional: Hashrate
+        if "hashRate" in board_data and (not entry["hashrate"] or entry["hashrate"].strip() != board_data["hashRate"]):
+            fields_to_update["customfield_10153"] = board_data["hashRate"]
+
+        return fields_to_update
+
+
+    def apply_board_fields_to_index(self, entry, fields):
+        #keeps the serial index in step with a successful write, so repeated posts are skipped locally
+        if "customfield_10230" in fields:
+            entry["board_model"] = fields["customfield_10230"]["value"]
+        if "customfield_10229" in fields:
+            entry["frequency"] = fields["customfield_10229"]
+        if "customfield_10153" in fields:
+            entry["hashrate"] = fields["customfield_10153"]
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Serial Index Functions
+#-----------------------------------------------------------------------------------------------------------
+
+    def on_epic_loaded(self, epic, old_issues):
+        #reindexes only the issues that were added, removed or changed by the (re)load
+        new_issues = epic.tasks + epic.stories
+        old_by_key = {issue.key: issue for issue in old_issues}
+        new_keys = set()
+
+        # readers fall back to scanning the epic until the count table matches it again
+        counts = self.status_counts.get(epic.key)
+        fresh_counts = counts is None or counts.start_ordinal != epic.start_date.date().toordinal()
+        if fresh_counts:
+            # a new table gets the changed issues from index_issue and the unchanged ones below, each once
+            counts = EpicStatusCounts(epic.start_date)
+            self.status_counts[epic.key] = counts
+        counts.begin_update()
+        status_changes = []
+        board_dates = {field: [] for field in BOARD_DATE_FIELDS} # sorted into the board date index once, after the loop
+
+        for issue in new_issues:
+            new_keys.add(issue.key)
+            old_issue = old_by_key.get(issue.key)
+            if old_issue is not None:
+                if old_issue == issue:
+                    if fresh_counts:
+                        counts.add_issue(issue)
+                    continue
+                self.unindex_issue(epic.key, old_issue)
+            self.index_issue(epic.key, issue, board_dates)
+            status_changes.append((old_issue, issue))
+
+        for issue in old_issues:
+            if issue.key not in new_keys:
+                self.unindex_issue(epic.key, issue)
+                status_changes.append((issue, None))
+
+        self.add_board_dates(board_dates)
+        counts.end_update(epic)
+
+        # sent by on_epics_published, once the new epic is the one requests read
+        if self.timeline_events.has_subscribers(epic.key):
+            self.pending_status_changes.setdefault(epic.key, []).extend(status_changes)
+
+
+    def on_epics_published(self, new_epics):
+        for epic_key, epic in new_epics.items():
+            status_changes = self.pending_status_changes.pop(epic_key, None)
+            if status_changes is not None:
+                self.timeline_events.publish(
+                    epic_key, self.build_epic_count_timeline(epic), self.build_status_changes(status_changes)
+                )
+
+
+    def index_issue(self, epic_key, issue, board_dates=None):
+        counts = self.status_counts.get(epic_key)
+        if counts is not None:
+            counts.add_issue(issue)
+
+        self.text_index.add(epic_key, issue)
+
+        if issue.type == "Task":
+            self.index_board(epic_key, issue, board_dates)
+            self.index_workload(epic_key, issue)
+            self.dwell_index.setdefault(epic_key, {})[issue.key] = self.compute_dwell_intervals(issue)
+
+        if issue.type == "Task" and issue.serial:
+            self.serial_index.setdefault(issue.serial.strip(), {})[issue.key] = {
+                "epic_key": epic_key,
+                "issue_key": issue.key,
+                "created": issue.created,
+                "board_model": issue.board_model,
+                "frequency": issue.frequency,
+                "hashrate": issue.hashrate,
+                **self.build_board_outcome(issue)
+            }
+
+
+    def unindex_issue(self, epic_key, issue):
+        counts = self.status_counts.get(epic_key)
+        if counts is not None:
+            counts.remove_issue(issue.key)
+
+        self.text_index.remove(epic_key, issue.key)
+
+        if issue.type == "Task":
+            self.unindex_board(epic_key, issue.key)
+            self.unindex_workload(epic_key, issue.key)
+            self.dwell_index.get(epic_key, {}).pop(issue.key, None)
+
+        if issue.type == "Task" and issue.serial:
+            serial = issue.serial.strip()
+            entries = self.serial_index.get(serial, {})
+            entries.pop(issue.key, None)
+            if not entries:
+                self.serial_index.pop(serial, None)
+
+
+    def lookup_serial(self, serial):
+        #returns the index entry of the newest task with this serial, or None if no loaded epic has it
+        entries = self.serial_index.get(serial.strip())
+        if not entries:
+            return None
+        return max(entries.values(), key=lambda entry: entry["created"])
+
+
+    def search_serial_in_jira(self, serial):
+        #cache miss, falls back to a JQL search and adds the result to the serial index
+        jql = f'summary ~ "{serial}" AND issuetype = Task'
+        issues = [issue for issue in self.search_issues(jql, batch_size=1, paginate=False) if not isinstance(issue, dict)]
+        if not issues:
+            return None
+        return self.index_raw_task(issues[0].raw)
+
+
+    def search_serials_in_jira(self, serials, chunk_size=50):
+        #cache misses for a batch, resolves them with one combined JQL search per chunk of serials
+        for i in range(0, len(serials), chunk_size):
+            chunk = serials[i:i + chunk_size]
+            summary_clause = " OR ".join(f'summary ~ "{serial}"' for serial in chunk)
+            jql = f'issuetype = Task AND ({summary_clause})'
+            for issue in self.search_issues(jql, batch_size=100):
+                if not isinstance(issue, dict):
+                    self.index_raw_task(issue.raw)
+
+
+    def search_epic_serials_in_jira(self, epic_key, serials, chunk_size=50):
+        #adds the tasks of the epic with one of the serials to the serial index, one JQL search per chunk of serials
+        for i in range(0, len(serials), chunk_size):
+            summary_clause = " OR ".join(f'summary ~ "{serial}"' for serial in serials[i:i + chunk_size])
+            jql = f'"Epic Link" = "{epic_key}" AND issuetype = Task AND ({summary_clause})'
+            for issue in self.search_issues(jql, batch_size=100):
+                if not isinstance(issue, dict):
+                    self.index_raw_task(issue.raw)
+
+
+    def serial_exists_in_epic(self, serial, epic_key):
+        return any(entry["epic_key"] == epic_key for entry in self.serial_index.get(serial.strip(), {}).values())
+
+
+    def build_board_outcome(self, issue):
+        #how one appearance of a board ended, kept in its serial index entry for the board lifecycle
+        repairs = self.get_repair_durations(issue)
+        current_status = issue.status_history[-1].to_status if issue.status_history else None
+
+        if any(change.to_status == "Scrap" for change in issue.status_history):
+            outcome = "Scrapped"
+        elif current_status == "Done":
+            outcome = "Repaired" if repairs else "Passed"
+        else:
+            outcome = "Open"
+
+        return {
+            "current_status": current_status,
+            "outcome": outcome,
+            "last_change": issue.status_history[-1].timestamp if issue.status_history else None,
+            "repairs": [{"technician": technician, "hours": round(hours, 2)} for technician, hours in repairs]
+        }
+
+
+    def get_board_lifecycle(self, serial):
+        #every loaded order the board appeared in, oldest first, one serial index lookup
+        entries = self.serial_index.get(serial.strip(), {})
+        epics = self.epics
+
+        appearances = []
+        for entry in sorted(entries.values(), key=lambda entry: entry["created"].timestamp() if entry["created"] else float("inf")):
+            epic = epics.get(entry["epic_key"])
+            repairs = entry.get("repairs", [])
+            appearances.append({
+                "epic_key": entry["epic_key"],
+                "epic_title": epic.title if epic else None,
+                "issue_key": entry["issue_key"],
+                "created": entry["created"].strftime("%Y-%m-%d %H:%M") if entry["created"] else None,
+                "last_change": entry["last_change"].strftime("%Y-%m-%d %H:%M") if entry.get("last_change") else None,
+                "board_model": entry["board_model"],
+                "current_status": entry.get("current_status"),
+                "outcome": entry.get("outcome"), # None for boards only found by a Jira search, not in a loaded epic
+                "repairs": repairs,
+                "repair_hours": round(sum(repair["hours"] for repair in repairs), 2)
+            })
+
+        return {
+            "serial": serial.strip(),
+            "appearance_count": len(appearances),
+            "order_count": len({appearance["epic_key"] for appearance in appearances}),
+            "scrap_count": sum(appearance["outcome"] == "Scrapped" for appearance in appearances),
+            "repair_count": sum(len(appearance["repairs"]) for appearance in appearances),
+            "repair_hours": round(sum(appearance["repair_hours"] for appearance in appearances), 2),
+            "appearances": appearances
+        }
+
+
+    def index_raw_task(self, raw_issue):
+        fields = raw_issue.get("fields", {})
+        board_model = fields.get("customfield_10230")
+        entry = {
+            "epic_key": fields.get("customfield_10014"),
+            "issue_key": raw_issue["key"],
+            "created": datetime.strptime(fields["created"], "%Y-%m-%dT%H:%M:%S.%f%z") if fields.get("created") else None,
+            "board_model": board_model.get("value") if isinstance(board_model, dict) else None,
+            "frequency": fields.get("customfield_10229"),
+            "hashrate": fields.get("customfield_10153")
+        }
+        self.serial_index.setdefault((fields.get("summary") or "").strip(), {})[raw_issue["key"]] = entry
+        return entry
 
-        except Exception as e:
-            logger.error(f"Error updating board data for serial {serial}: {e}")
 
     def find_duplicate_serials_in_epic(self, epic_key):
         """
@@ -408,13 +932,267 @@ class JiraClient(JiraWrapper):
         return duplicates
 
 
+#-----------------------------------------------------------------------------------------------------------
+# Board Query Functions
+#-----------------------------------------------------------------------------------------------------------
+
+    def index_board(self, epic_key, issue, board_dates=None):
+        #board_dates collects the date index entries for add_board_dates, None inserts them right away
+        last_change = issue.status_history[-1] if issue.status_history else None
+        record = {
+            "epic_key": epic_key,
+            "issue_key": issue.key,
+            "serial": issue.serial,
+            "board_model": issue.board_model,
+            "status": last_change.to_status if last_change else None,
+            "assignee": issue.assignee,
+            "created": issue.created.strftime("%Y-%m-%d %H:%M:%S"),
+            "status_changed": last_change.timestamp.strftime("%Y-%m-%d %H:%M:%S") if last_change else None
+        }
+        dates = {
+            "created": issue.created.date().toordinal(),
+            "status_changed": last_change.timestamp.date().toordinal() if last_change else None
+        }
+
+        with self.board_index_lock:
+            self._remove_board(issue.key)
+            self.board_records[issue.key] = (record, dates)
+            for field in BOARD_QUERY_FIELDS:
+                if record[field] is not None:
+                    self.board_field_index[field].setdefault(record[field], set()).add(issue.key)
+            for field in BOARD_DATE_FIELDS:
+                if dates[field] is not None:
+                    if board_dates is None:
+                        bisect.insort(self.board_date_index[field], (dates[field], issue.key))
+                    else:
+                        board_dates[field].append((dates[field], issue.key))
+
+
+    def add_board_dates(self, board_dates):
+        #one sort per field instead of an insort per board, the sort merges the already sorted index in linear time
+        with self.board_index_lock:
+            for field, entries in board_dates.items():
+                if entries:
+                    self.board_date_index[field].extend(entries)
+                    self.board_date_index[field].sort()
+
+
+    def unindex_board(self, epic_key, issue_key):
+        with self.board_index_lock:
+            entry = self.board_records.get(issue_key)
+            # an issue moved to another epic is already indexed under that one
+            if entry is not None and entry[0]["epic_key"] == epic_key:
+                self._remove_board(issue_key)
+
+
+    def _remove_board(self, issue_key):
+        #call while holding board_index_lock
+        entry = self.board_records.pop(issue_key, None)
+        if entry is None:
+            return
+        record, dates = entry
+
+        for field in BOARD_QUERY_FIELDS:
+            keys = self.board_field_index[field].get(record[field])
+            if keys is not None:
+                keys.discard(issue_key)
+                if not keys:
+                    del self.board_field_index[field][record[field]]
+        for field in BOARD_DATE_FIELDS:
+            if dates[field] is not None:
+                date_index = self.board_date_index[field]
+                position = bisect.bisect_left(date_index, (dates[field], issue_key))
+                if position < len(date_index) and date_index[position] == (dates[field], issue_key):
+                    del date_index[position]
+
+
+    def query_boards(self, filters=None, date_from=None, date_to=None, date_field="created", open_orders=False, limit=1000):
+        """
+        Finds boards across every loaded epic from the inverted indexes.
+        filters maps board_model, status, assignee or epic_key to a value or a list of values, a board matches when
+        it has one of the values of every filter. date_from and date_to are inclusive dates for date_field.
+        open_orders leaves out the boards of orders where every board is Done.
+        Returns {"count": number of matches, "boards": the first limit board records, sorted by epic and serial}.
+        """
+        filters = filters or {}
+
+        with self.board_index_lock:
+            candidate_sets = []
+            for field, values in filters.items():
+                values = values if isinstance(values, (list, tuple, set)) else [values]
+                field_index = self.board_field_index[field]
+                candidate_sets.append(set().union(*(field_index.get(value, ()) for value in values)))
+
+            if date_from is not None or date_to is not None:
+                date_index = self.board_date_index[date_field]
+                start = bisect.bisect_left(date_index, (date_from.toordinal(),)) if date_from else 0
+                end = bisect.bisect_left(date_index, (date_to.toordinal() + 1,)) if date_to else len(date_index)
+                candidate_sets.append({issue_key for _, issue_key in date_index[start:end]})
+
+            # intersect starting from the most selective filter
+            candidate_sets.sort(key=len)
+            if candidate_sets:
+                matches = candidate_sets[0].intersection(*candidate_sets[1:])
+            else:
+                matches = set(self.board_records)
+
+            if open_orders:
+                done_keys = self.board_field_index["status"].get("Done", set())
+                epic_index = self.board_field_index["epic_key"]
+                closed_epics = {
+                    epic_key for epic_key in {self.board_records[issue_key][0]["epic_key"] for issue_key in matches}
+                    if epic_index[epic_key] <= done_keys
+                }
+                matches = {issue_key for issue_key in matches if self.board_records[issue_key][0]["epic_key"] not in closed_epics}
+
+            records = [dict(self.board_records[issue_key][0]) for issue_key in matches]
+
+        records.sort(key=lambda record: (record["epic_key"], record["serial"] or "", record["issue_key"]))
+        return {"count": len(records), "boards": records[:limit]}
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Technician Workload Functions
+#-----------------------------------------------------------------------------------------------------------
+
+    def index_workload(self, epic_key, issue):
+        transitions = [(change.author, change.timestamp.date().toordinal(), change.to_status) for change in issue.status_history]
+        with self.workload_lock:
+            self._remove_workload(issue.key)
+            self.workload_contributions[issue.key] = (epic_key, transitions)
+            self._apply_workload(transitions, 1)
+
+
+    def unindex_workload(self, epic_key, issue_key):
+        with self.workload_lock:
+            contribution = self.workload_contributions.get(issue_key)
+            # an issue moved to another epic is already indexed under that one
+            if contribution is not None and contribution[0] == epic_key:
+                self._remove_workload(issue_key)
+
+
+    def _remove_workload(self, issue_key):
+        #call while holding workload_lock
+        contribution = self.workload_contributions.pop(issue_key, None)
+        if contribution is not None:
+            self._apply_workload(contribution[1], -1)
+
+
+    def _apply_workload(self, transitions, sign):
+        for technician, day, status in transitions:
+            days = self.workload_index.setdefault(technician, {})
+            statuses = days.setdefault(day, {})
+            statuses[status] = statuses.get(status, 0) + sign
+            if not statuses[status]:
+                del statuses[status]
+                if not statuses:
+                    del days[day]
+                    if not days:
+                        del self.workload_index[technician]
+
+
+    def get_technician_workload(self, date_from=None, date_to=None, technicians=None, statuses=None):
+        """
+        Counts the boards each technician moved into each status per day, across every loaded epic.
+        date_from and date_to are inclusive dates, technicians and statuses optional collections to filter on.
+        """
+        first = date_from.toordinal() if date_from else None
+        last = date_to.toordinal() if date_to else None
+        result = {}
+
+        with self.workload_lock:
+            for technician, days in self.workload_index.items():
+                if technicians is not None and technician not in technicians:
+                    continue
+
+                # walk the requested range or the technician's days, whichever is shorter
+                if first is not None and last is not None and last - first < len(days):
+                    day_counts = ((day, days[day]) for day in range(first, last + 1) if day in days)
+                else:
+                    day_counts = ((day, counts) for day, counts in days.items()
+                                  if (first is None or day >= first) and (last is None or day <= last))
+
+                by_day = {}
+                by_status = {}
+                for day, counts in day_counts:
+                    counts = {status: count for status, count in counts.items() if statuses is None or status in statuses}
+                    if not counts:
+                        continue
+                    by_day[date.fromordinal(day).isoformat()] = counts
+                    for status, count in counts.items():
+                        by_status[status] = by_status.get(status, 0) + count
+
+                if by_day:
+                    result[technician] = {
+                        "total": sum(by_status.values()),
+                        "by_status": dict(sorted(by_status.items())),
+                        "days": dict(sorted(by_day.items()))
+                    }
+
+        return {
+            "date_from": date_from.isoformat() if date_from else None,
+            "date_to": date_to.isoformat() if date_to else None,
+            "technicians": dict(sorted(result.items()))
+        }
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Repair Note Search Functions
+#-----------------------------------------------------------------------------------------------------------
+
+    def search_repair_notes(self, query, epic_key=None, limit=20):
+        #full text search over the comments and repair summaries of every loaded issue, best matches first
+        count, results = self.text_index.search(query, epic_key, limit)
+        return {
+            "query": query,
+            "rt_num": epic_key,
+            "count": count,
+            "results": results
+        }
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Timeline Events
+#-----------------------------------------------------------------------------------------------------------
+
+    def subscribe_timeline(self, epic_key):
+        #returns (subscription, current count timeline), the subscription gets the changes published after it.
+        #(None, None) if too many streams are open
+        subscription = self.timeline_events.subscribe(epic_key)
+        if subscription is None:
+            return None, None
+        timeline = self.build_epic_count_timeline(self.epics[epic_key])
+        version = self.timeline_events.set_baseline(epic_key, timeline)
+        return subscription, {"rt": epic_key, "version": version, "timeline": timeline}
+
+
+    def build_status_changes(self, changed_issues):
+        #(old issue or None, new issue or None) pairs -> the issues whose current status changed
+        changes = []
+        for old_issue, new_issue in changed_issues:
+            old_status = old_issue.status_history[-1].to_status if old_issue and old_issue.status_history else None
+            new_status = new_issue.status_history[-1].to_status if new_issue and new_issue.status_history else None
+            if old_issue is not None and new_issue is not None and old_status == new_status:
+                continue
+            issue = new_issue or old_issue
+            changes.append({
+                "key": issue.key,
+                "serial": issue.serial,
+                "type": issue.type,
+                "assignee": issue.assignee,
+                "from_status": old_status,
+                "to_status": new_status,
+                "removed": new_issue is None
+            })
+        return changes
+
+
 #-----------------------------------------------------------------------------------------------------------
 # Timeline Functions
 #-----------------------------------------------------------------------------------------------------------
 
-    def epic_start_date(self, epic_key):
-        issues = self.epics[epic_key].tasks
-        epic = self.epics[epic_key]
+    def epic_start_date(self, epic):
+        issues = epic.tasks
 
         if not issues:
             return None
@@ -424,13 +1202,16 @@ class JiraClient(JiraWrapper):
         first_date = datetime.combine(epic_start_date, datetime.min.time())
         return first_date
 
-    def epic_end_date(self, epic_key):
-        issues = self.epics[epic_key].tasks
-        epic = self.epics[epic_key]
+    def epic_end_date(self, epic):
+        issues = epic.tasks
 
         if not issues:
             return None
 
+        counts = self.get_status_counts(epic)
+        if counts is not None:
+            return counts.end_date
+
         epic_start_date = epic.start_date.date() if hasattr(epic.start_date, 'date') else epic.start_date
 
         # Find the first date when all tasks are in 'Done' status
@@ -489,8 +1270,8 @@ class JiraClient(JiraWrapper):
 
         return last_date
 
-    def get_max_min_epic_dates(self, epic_key):
-        return self.epic_start_date(epic_key), self.epic_end_date(epic_key)
+    def get_max_min_epic_dates(self, epic):
+        return self.epic_start_date(epic), self.epic_end_date(epic)
 
 
 
@@ -516,8 +1297,69 @@ class JiraClient(JiraWrapper):
         return timeline
 
 
-    def get_first_date_from_timeline(self, epic_key):
-        timeline = self.build_and_fill_epic_timeline(epic_key, format_date=False)
+    def get_status_counts(self, epic):
+        #returns the dense day x status counts of the epic, or None while the count table is being updated
+        counts = self.status_counts.get(epic.key)
+        return counts.snapshot(epic) if counts is not None else None
+
+
+    def build_epic_count_timeline(self, epic, format_date=True):
+        #same days, statuses and pruning as build_and_fill_epic_timeline, with the number of issues instead of the issues
+        counts = self.get_status_counts(epic)
+        if counts is None:
+            timeline = self.build_and_fill_epic_timeline(epic, format_date)
+            if timeline is None:
+                return None
+            return {
+                day: {status: len(issues) if issues else 0 for status, issues in day_data.items()}
+                for day, day_data in timeline.items()
+            }
+
+        start_date, end_date = self.get_max_min_epic_dates(epic)
+
+        if start_date is None and end_date is None:
+            logger.warning(f"No data for {epic.key}")
+            return None
+
+        days = list(date_range(epic.start_date.date(), end_date))
+        totals = ['Total Boards', 'Total Chassis', 'Total Processed']
+        status_list = totals + sorted(
+            status for status in counts.columns
+            if status not in totals and any(counts.count(status, day) for day in days)
+        )
+        total_boards = [counts.count('Total Boards', day) for day in days]
+
+        # skip the leading days without boards and stop at the first day every board is Done
+        pruned_timeline = {}
+        started = False
+        for i, day in enumerate(days):
+            if total_boards[i] >= 1 or (i + 1 < len(days) and total_boards[i + 1] >= 1):
+                started = True
+            if started:
+                done = counts.count('Done', day)
+                if done and done == total_boards[i]:
+                    break
+                pruned_timeline[day] = {status: counts.count(status, day) for status in status_list}
+
+        if not started:
+            pruned_timeline = {day: {status: counts.count(status, day) for status in status_list} for day in days}
+
+        if not format_date:
+            return pruned_timeline
+        return {day.isoformat(): data for day, data in pruned_timeline.items()}
+
+
+    def create_epic_count_timeline_data(self, epic_key):
+        epic = self.epics[epic_key]
+        return {
+            "rt": epic.key,
+            "title": epic.title,
+            "timeline": self.build_epic_count_timeline(epic)
+        }
+
+
+    def get_first_date_from_timeline(self, epic):
+        timeline = self.build_epic_count_timeline(epic, format_date=False)
         if timeline is None:
             return None
         timeline_keys = list(timeline.keys())
@@ -532,25 +1374,50 @@ class JiraClient(JiraWrapper):
         #    for _ in self.dump_issues_to_files(epic_key): #supposed to auto download the jira issues if they are missing
         #        pass
 
+        return self.build_epic_timeline_data(self.epics[epic_key])
+
+
+    def build_epic_timeline_data(self, epic):
         epic_data = {
-            "rt": epic_key,
-            "title": self.epics[epic_key].title,
-            "timeline": self.build_and_fill_epic_timeline(epic_key)
+            "rt": epic.key,
+            "title": epic.title,
+            "timeline": self.build_and_fill_epic_timeline(epic)
         }
 
         return epic_data
 
 
-    def build_and_fill_epic_timeline(self, epic_key, format_date = True):
+    def create_epic_timelines_data(self, epic_keys):
+        #computes the timelines for several epics, yields each one as soon as it is ready
+        #built one after the other: the work is pure Python, threads would only add GIL contention
+        epics = self.epics #shared snapshot, refreshes publish a new dict so this one never changes
+
+        requested = set()
+        for epic_key in epic_keys:
+            if epic_key in requested:
+                continue
+            requested.add(epic_key)
+            if epic_key not in epics:
+                yield {"rt": epic_key, "error": f"Epic {epic_key} not found"}
+                continue
+
+            try:
+                yield self.build_epic_timeline_data(epics[epic_key])
+            except Exception as e:
+                logger.error(f"Failed to build timeline for {epic_key}: {e}")
+                yield {"rt": epic_key, "error": str(e)}
+
+
+    def build_and_fill_epic_timeline(self, epic, format_date = True):
             #creates a timeline container with total counts for each status for each day
-            start_date, end_date = self.get_max_min_epic_dates(epic_key)
+            start_date, end_date = self.get_max_min_epic_dates(epic)
 
             if start_date is None and end_date is None:
-                logger.warning(f"No data for {epic_key}")
+                logger.warning(f"No data for {epic.key}")
                 return None
 
             #override
-            start_date = self.epics[epic_key].start_date.date()
+            start_date = epic.start_date.date()
 
         # PART 1: create the empty timeline container
 
@@ -562,7 +1429,7 @@ class JiraClient(JiraWrapper):
                     timeline[day][status] = []
 
         # PART 2: insert hb statuses into timeline container
-            issues = self.epics[epic_key].tasks
+            issues = epic.tasks
 
             # Advanced Repair or Backlog overnight is an error, shift it to Awating advanced repair
             convert_status = {
@@ -594,7 +1461,7 @@ class JiraClient(JiraWrapper):
                     timeline[day]['Total Boards'].append(hb_obj)
 
         # PART 3: insert chassis status into the timeline
-            issues = self.epics[epic_key].stories
+            issues = epic.stories
 
             for issue in issues:
                 chassis_timeline = self.simplify_issue_timeline(issue, start_date, end_date)
@@ -671,54 +1538,29 @@ class JiraClient(JiraWrapper):
 #-----------------------------------------------------------------------------------------------------------
 
     def get_all_order_summaries(self):
-        summary_data = []
+        return {
+            "labels": dict(ORDER_SUMMARY_LABELS),
+            "order": list(ORDER_SUMMARY_COLUMNS),
+            "data": list(self.iter_order_summaries())
+        }
 
-        for epic_key in self.epics:
-            epic_summary = self.get_order_summary(epic_key)
-            summary_data.append(epic_summary)
 
-        return {
-            "labels": {
-                "rt_num": "Epic Key",
-                "summary": "Summary",
-                "created": "Created Date",
-                "board_count": "Boards",
-                'chassis_count': "Chassis",
-                'is_closed': "Order State",
-                'status_counts': "Status Counts",
-                'first_date': "Start Date",
-                'last_date': "Close Date",
-                'day_count': "Days",
-                'process_rate': "per Day"
-            },
-            "order": [
-                "rt_num",
-                "created",
-                "summary",
-                "board_count",
-                "chassis_count",
-                "first_date",
-                "last_date",
-                "day_count",
-                "process_rate",
-                "is_closed",
-                "status_counts"
-            ],
-            "data": summary_data
-        }        
-
-
-    def is_order_closed(self, epic_key):
+    def iter_order_summaries(self):
+        for epic in self.epics.values():
+            yield self.get_order_summary(epic)
+
+
+    def is_order_closed(self, epic):
         """
         returns true if the order is closed, returns false if the order is open, returns none if the order has no data.
         an order is considered closed when all the tasks are in the 'Done' status on the same day.
         """
-        epic = self.epics[epic_key]
         board_count = len(epic.tasks)
 
         done_count = 0
         for issue in epic.tasks:
-            last_status = issue.status_history[-1].to_status
+            # a new board, from an issue_created webhook, has no status change yet and is not Done
+            last_status = issue.status_history[-1].to_status if issue.status_history else None
             if last_status == 'Done':
                 done_count += 1
         if done_count == board_count:
@@ -729,13 +1571,12 @@ class JiraClient(JiraWrapper):
         return False
     
 
-    def get_board_counts(self, epic_key):
-        epic = self.epics[epic_key]
+    def get_board_counts(self, epic):
         board_count = len(epic.tasks)
         status_counts = {"Passed Initial Diagnosis": 0, "Awaiting Functional Test": 0, "Scrap": 0}
         
         if board_count > 0:
-            epic_timeline = self.build_and_fill_epic_timeline(epic_key=epic_key, format_date=False)
+            epic_timeline = self.build_epic_count_timeline(epic, format_date=False)
             if epic_timeline:
                 # Get all days and reverse them to start from the last day
                 timeline_days = list(epic_timeline.keys())
@@ -747,8 +1588,7 @@ class JiraClient(JiraWrapper):
                     
                     # Count statuses for this day
                     for status in temp_status_counts:
-                        if status in day_data and day_data[status]:
-                            temp_status_counts[status] = len(day_data[status])
+                        temp_status_counts[status] = day_data.get(status, 0)
                     
                     # Check if this day's counts match the board_count
                     reported_total = sum(temp_status_counts.values())
@@ -761,29 +1601,27 @@ class JiraClient(JiraWrapper):
                 last_day = timeline_days[0]  # First in reversed list is the last day
                 last_day_data = epic_timeline[last_day]
                 for status in status_counts:
-                    if status in last_day_data and last_day_data[status]:
-                        status_counts[status] = len(last_day_data[status])
+                    status_counts[status] = last_day_data.get(status, 0)
                 
                 reported_total = sum(status_counts.values())
                 status_counts['ERROR'] = f"MISSING {board_count - reported_total} BOARDS"
         
         return status_counts
 
-    def get_order_summary(self, epic_key):
-        epic = self.epics[epic_key]
+    def get_order_summary(self, epic):
         board_count = len(epic.tasks)
         chassis_count = len(epic.stories)
 
-        order_state = self.is_order_closed(epic_key)
+        order_state = self.is_order_closed(epic)
         is_closed = "Open"
         if order_state:
             is_closed = "Closed"
         if order_state is None:
             is_closed = ""
 
-        status_counts = self.get_board_counts(epic_key)
-        first_date = self.get_first_date_from_timeline(epic_key)
-        _, last_date = self.get_max_min_epic_dates(epic_key)
+        status_counts = self.get_board_counts(epic)
+        first_date = self.get_first_date_from_timeline(epic)
+        _, last_date = self.get_max_min_epic_dates(epic)
         
         # Format dates to ISO format (YYYY-MM-DD) without time
         first_date_str = first_date.strftime('%Y-%m-%d') if first_date else None
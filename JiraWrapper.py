@@ -1,61 +1,280 @@
 from jira import JIRA
 from jira.exceptions import JIRAError
-from datetime import datetime
+from datetime import datetime, timezone
 from dotenv import load_dotenv
-import os, time, json, requests
+import os, time, json, requests, threading
 from requests.auth import HTTPBasicAuth
 
+from contextlib import contextmanager
+
 from helper import logger, full_rt
-from issueWrapper import Epic
+import metrics
+from issueWrapper import Epic, normalize_issue, normalize_comment
+from snapshotStore import SnapshotStore
 
 
 load_dotenv()
 
+# board models the Jira model field accepts, boards of any other model are created without it
+VALID_BOARD_MODELS = frozenset([
+    "NBS1906",
+    "BHB42831",
+    "NBP1901",
+    "BHB42603",
+    "BHB42631",
+    "BHB42841",
+    "BHB42601",
+    "BHB56801",
+    "BHB42621",
+    "BHB42651",
+    "BHB56903",
+    "BHB68606",
+    "BHB68603",
+    "A3HB70601",
+    "BHB68701",
+    "BHB68703"
+])
+
+WEBHOOK_ISSUE_EVENTS = ("jira:issue_created", "jira:issue_updated", "jira:issue_deleted")
+WEBHOOK_COMMENT_EVENTS = ("comment_created", "comment_updated", "comment_deleted")
+
 
 #-----------------------------------------------------------------------------------------------------------
 # JiraClient Class
 #-----------------------------------------------------------------------------------------------------------
 
 class JiraWrapper:
-    def __init__(self):
+    def __init__(self, lazy_startup=None):
         self.server = os.getenv('SERVER')
         self.email = os.getenv('EMAIL')
         self.token = os.getenv('JIRA_TOKEN')
         self.root_cert = os.getenv('ROOT_CERT')
         self.last_request_time = 0
         self.RATE_LIMIT_DELAY = 1.0
-        self.jira = self.connect()
+        self.rate_limit_lock = threading.Lock()
+        self._jira = None # connected on first use, see the jira property
+        self.jira_lock = threading.Lock()
         self.data_directory = "jira_dumps"
         self.epic_prune_file = "epic_prune.json"
-        
-        # Fetch and store epic metadata in memory on app load
-        self.epic_metadata = self.get_epics_from_jira()
-        if self.epic_metadata is None:
-            logger.error("Failed to fetch epics from JIRA API during initialization")
-            self.epic_metadata = []
+        self.epic_metadata_file = "epic_metadata.json"
+
+        self.epic_metadata = []
+        self.epic_metadata_source = None # "cache" or "jira", None until the epic list is known
+        self.last_epic_refresh = None
+        self.ready = False
+        self.epics = {} # epic key -> immutable Epic, replaced as a whole by publish_epics, never modified in place
+        self.epics_write_lock = threading.Lock()
+        self.epic_update_lock = threading.Lock() # serializes rebuilding an epic from a refresh or a webhook event
+
+        # with SHARED_SNAPSHOT, every server worker reads the epics from one snapshot and only one refreshes at a time
+        self.snapshot_store = None
+        self.snapshot_generation = 0
+        self.snapshot_digests = {}
+        self.snapshot_sync_lock = threading.Lock()
+        if os.getenv('SHARED_SNAPSHOT', 'false').lower() in ('1', 'true', 'yes'):
+            self.snapshot_store = SnapshotStore(os.path.join(self.data_directory, "snapshot"))
+            self.sync_snapshot()
+
+        if lazy_startup is None:
+            lazy_startup = os.getenv('LAZY_STARTUP', 'true').lower() in ('1', 'true', 'yes')
+
+        if lazy_startup:
+            # serve right away from the epic list cached by the last refresh, then refresh it in the background
+            cached_metadata = self.load_cached_epic_metadata()
+            if cached_metadata is not None:
+                self.epic_metadata = cached_metadata
+                self.epic_metadata_source = "cache"
+                with self.refresh_guard():
+                    self.load_epics()
+                self.ready = True
+            threading.Thread(target=self.refresh_epic_list, name="epic-list-refresh", daemon=True).start()
+        else:
+            # Fetch and store epic metadata in memory on app load
+            self.refresh_epic_list()
+
+
+    @property
+    def jira(self):
+        if self._jira is None:
+            with self.jira_lock:
+                if self._jira is None:
+                    self._jira = self.connect()
+        return self._jira
+
+
+    def refresh_epic_list(self):
+        #fetches the epic list from Jira, caches it to disk and loads any epic that is not in memory yet
+        epic_metadata = self.get_epics_from_jira()
+        if epic_metadata is None:
+            logger.error("Failed to fetch epics from JIRA API")
+            if self.epic_metadata_source is None:
+                self.ready = True # nothing cached either, serve the empty list like before
+            return
 
-        # Load epic metadata into memory
-        rt_epic_data = self.load_epic_metadata() 
+        self.epic_metadata = epic_metadata
+        self.epic_metadata_source = "jira"
+        self.save_cached_epic_metadata(epic_metadata)
+        with self.refresh_guard():
+            self.load_epics()
+        self.last_epic_refresh = datetime.now()
+        self.ready = True
+        logger.info(f"Epic list refreshed, {len(self.epics)} epics loaded")
 
-        self.epics = {}
 
-        #load epics from epic metadata
-        for epic_data in rt_epic_data:
+    def load_epics(self):
+        #loads the epics from the epic metadata that are not loaded yet, then publishes them with one swap
+        new_epics = {}
+
+        for epic_data in self.load_epic_metadata():
             key = epic_data.get("key", "")
-            fields = epic_data.get("fields", {})
-            if key.startswith("RT-"):
-                created_time = datetime.strptime(fields["created"][:19], "%Y-%m-%dT%H:%M:%S")
-                title=fields.get("summary", "")
-            
-                epic = Epic(key=key, title=title, start_date=created_time)
+            if key.startswith("RT-") and key not in self.epics:
+                new_epics[key] = self.load_epic(epic_data)
+
+        if new_epics:
+            self.publish_epics(new_epics)
+            self.publish_snapshot(new_epics)
+
+
+    def publish_epics(self, new_epics):
+        #copy-on-write: readers keep using the dict they already hold, writers swap in a new one with one assignment
+        with self.epics_write_lock:
+            self.epics = {**self.epics, **new_epics}
+        self.on_epics_published(new_epics)
+
+
+    def load_epic(self, epic_data):
+        load_start = time.perf_counter()
+        key = epic_data.get("key", "")
+        fields = epic_data.get("fields", {})
+        created_time = datetime.strptime(fields["created"][:19], "%Y-%m-%dT%H:%M:%S")
+        title=fields.get("summary", "")
+    
+        issue_data = []
+        issue_file = os.path.join(self.data_directory,f"{key}.json")
+        if os.path.exists(issue_file):
+            with open(issue_file, "r", encoding="utf-8") as issue_f:
+                issue_data = json.load(issue_f)
+
+        epic = Epic.from_json(key, title, created_time, issue_data)
+
+        self.on_epic_loaded(epic, [])
+        metrics.epic_load_duration.observe(time.perf_counter() - load_start)
+        return epic
+
+
+    def load_cached_epic_metadata(self):
+        #returns the epic metadata saved by the last successful refresh, or None if there is none
+        file_path = os.path.join(self.data_directory, self.epic_metadata_file)
+        if not os.path.exists(file_path):
+            return None
+
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.exception(f"Error reading cached epic metadata '{file_path}': {e}")
+            return None
+
+
+    def save_cached_epic_metadata(self, epic_metadata):
+        file_path = os.path.join(self.data_directory, self.epic_metadata_file)
+        try:
+            os.makedirs(self.data_directory, exist_ok=True)
+            tmp_path = file_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(epic_metadata, f, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            logger.exception(f"Failed to cache epic metadata to '{file_path}': {e}")
+
+
+    def get_readiness(self):
+        return {
+            "ready": self.ready,
+            "epic_count": len(self.epics),
+            "epic_metadata_source": self.epic_metadata_source,
+            "last_epic_refresh": self.last_epic_refresh,
+            "jira_connected": self._jira is not None
+        }
+
+
+    @contextmanager
+    def refresh_guard(self):
+        #wraps every refresh, with a shared snapshot it holds the cross-worker refresh lock and starts from the latest generation
+        if self.snapshot_store is None:
+            yield
+            return
+
+        with self.snapshot_store.refresh_lock():
+            self.sync_snapshot()
+            yield
+
+
+    def sync_snapshot(self):
+        #picks up the epics another worker published since the last call, cheap when nothing changed
+        if self.snapshot_store is None or self.snapshot_store.current_generation() == self.snapshot_generation:
+            return
+
+        with self.snapshot_sync_lock:
+            generation, changed_epics, digests = self.snapshot_store.read(self.snapshot_digests)
+            if digests is None or generation == self.snapshot_generation:
+                return
+
+            for key, epic in changed_epics.items():
+                old_epic = self.epics.get(key)
+                self.on_epic_loaded(epic, old_epic.tasks + old_epic.stories if old_epic else [])
+
+            self.publish_epics(changed_epics)
+            self.snapshot_generation = generation
+            self.snapshot_digests = digests
+            logger.info(f"Loaded epic snapshot generation {generation} ({len(changed_epics)} changed epics)")
 
-                issue_file = os.path.join(self.data_directory,f"{key}.json")
-                if os.path.exists(issue_file):
-                    with open(issue_file, "r", encoding="utf-8") as issue_f:
-                        issue_data = json.load(issue_f)
-                        epic.load_json(issue_data)
 
-                self.epics[key] = epic
+    def publish_snapshot(self, changed_epics):
+        #call inside refresh_guard, after the changed epics were loaded into memory
+        if self.snapshot_store is None:
+            return
+
+        with self.snapshot_sync_lock:
+            self.snapshot_generation, self.snapshot_digests = self.snapshot_store.publish(changed_epics)
+
+
+    def on_epic_loaded(self, epic, old_issues):
+        #hook called every time an epic is (re)loaded, subclasses use it to keep their indexes current
+        pass
+
+
+    def on_epics_published(self, new_epics):
+        #hook called once (re)loaded epics replaced the old ones in self.epics
+        pass
+
+
+    def throttle(self):
+        #blocks until the shared rate limit allows another request to Jira, safe to call from several threads
+        wait_start = time.perf_counter()
+        with self.rate_limit_lock:
+            elapsed = time.time() - self.last_request_time
+            if elapsed < self.RATE_LIMIT_DELAY:
+                time.sleep(self.RATE_LIMIT_DELAY - elapsed)
+            self.last_request_time = time.time()
+        metrics.rate_limiter_wait.observe(time.perf_counter() - wait_start)
+
+
+    def send_jira_request(self, endpoint, method, url, **kwargs):
+        #sends one request to Jira and records its latency and status, endpoint is the metrics label
+        request_start = time.perf_counter()
+        try:
+            response = requests.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.jira_requests.inc(endpoint=endpoint, status="error")
+            raise
+        finally:
+            metrics.jira_request_duration.observe(time.perf_counter() - request_start, endpoint=endpoint)
+
+        metrics.jira_requests.inc(endpoint=endpoint, status=str(response.status_code))
+        if response.status_code == 429:
+            metrics.jira_rate_limited.inc(endpoint=endpoint)
+        return response
 
 
     def connect(self):
@@ -83,9 +302,7 @@ class JiraWrapper:
         current_count = 0
 
         while True:
-            elapsed = time.time() - self.last_request_time
-            if elapsed < self.RATE_LIMIT_DELAY:
-                time.sleep(self.RATE_LIMIT_DELAY - elapsed)
+            self.throttle()
 
             try:
                 # Build the API URL for v3 search
@@ -108,20 +325,19 @@ class JiraWrapper:
                     params["nextPageToken"] = next_page_token
 
                 # Make the request
-                response = requests.get(
-                    url, 
+                response = self.send_jira_request(
+                    "search", "GET", url,
                     params=params,
                     auth=HTTPBasicAuth(self.email, self.token),
                     verify=self.root_cert if self.root_cert else True
                 )
                 
-                self.last_request_time = time.time()
-                
                 if response.status_code == 429:
                     retry_after = int(response.headers.get('Retry-After', 10))
                     logger.warning(f"[Retry {retries+1}/{max_retries}] 429 Too Many Requests - Backing off for {retry_after} seconds...")
                     time.sleep(retry_after)
                     retries += 1
+                    metrics.jira_retries.inc(endpoint="search")
                     if retries > max_retries:
                         logger.warning("Max retries reached.")
                         break
@@ -161,6 +377,7 @@ class JiraWrapper:
             except requests.exceptions.RequestException as e:
                 logger.error(f"Request error: {e}")
                 retries += 1
+                metrics.jira_retries.inc(endpoint="search")
                 if retries > max_retries:
                     logger.warning("Max retries reached.")
                     break
@@ -181,6 +398,49 @@ class JiraWrapper:
 
         return JiraIssueCompat(issue_data)
 
+    def update_issue_fields(self, issue_key, fields, max_retries=5):
+        """Edits the fields of a single issue through the v3 API, returns True on success"""
+        url = f"{self.server}/rest/api/3/issue/{issue_key}"
+        retries = 0
+
+        while True:
+            self.throttle()
+
+            try:
+                response = self.send_jira_request(
+                    "edit", "PUT", url,
+                    json={"fields": fields},
+                    auth=HTTPBasicAuth(self.email, self.token),
+                    verify=self.root_cert if self.root_cert else True
+                )
+
+                if response.status_code == 429:
+                    retry_after = int(response.headers.get('Retry-After', 10))
+                    logger.warning(f"[Retry {retries+1}/{max_retries}] 429 Too Many Requests - Backing off for {retry_after} seconds...")
+                    time.sleep(retry_after)
+                    retries += 1
+                    metrics.jira_retries.inc(endpoint="edit")
+                    if retries > max_retries:
+                        logger.warning("Max retries reached.")
+                        return False
+                    continue
+
+                response.raise_for_status()
+                return True
+
+            except requests.exceptions.HTTPError as e:
+                logger.error(f"Failed to update {issue_key}: {e} {e.response.text if e.response is not None else ''}")
+                return False
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request error: {e}")
+                retries += 1
+                metrics.jira_retries.inc(endpoint="edit")
+                if retries > max_retries:
+                    logger.warning("Max retries reached.")
+                    return False
+                time.sleep(2 ** retries)  # Exponential backoff
+
+
     def search_issues(self, jql_str, max_retries=10, batch_size=100, paginate=True, expand=None, yield_progress=False, **kwargs):
         """Main search method that now uses v3 API by default"""
         return self.search_issues_v3(jql_str, max_retries, batch_size, paginate, expand, yield_progress, **kwargs)
@@ -247,49 +507,233 @@ class JiraWrapper:
         file_path = os.path.join(self.data_directory, f"{full_key}.json")
         os.makedirs(self.data_directory, exist_ok=True)
 
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"Deleted file {file_path}")
-        except Exception as e:
-            logger.exception(f"Failed to delete {file_path}: {e}")
-
         logger.info(f"Dumping all task issues for {full_key}...")
 
         issue_data = []
+        refresh_start = time.perf_counter()
 
         try:
-            #collect the issues
+            #collect the issues, no lock is held while the progress updates are streamed to the caller
             for issue in self.get_jira_issues_from_epic(full_key, expand="changelog,comment", yield_progress=True):
                 if isinstance(issue, dict) and issue.get("progress_update"):
                     yield issue
                 else:
-                    issue_data.append(issue.raw)
-
-            #dump issues to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(issue_data, f, indent=2, ensure_ascii=False)
-
-                #load the new data into the epic model
-                self.epics[epic_key].issues = None
-                self.epics[epic_key].load_json(issue_data)
+                    # only the compact record is kept, dumps written before this stay readable as they are
+                    issue_data.append(normalize_issue(issue.raw))
+
+            #with a shared snapshot only one worker writes at a time, the others pick the result up from the snapshot.
+            #nothing is yielded in here, so a slow or abandoned response cannot hold the locks
+            with self.refresh_guard(), self.epic_update_lock:
+                tmp_path = file_path + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(issue_data, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(tmp_path, file_path)
+
+                #build the new epic off to the side, then publish it with one reference swap
+                old_epic = self.epics[epic_key]
+                epic = Epic.from_json(old_epic.key, old_epic.title, old_epic.start_date, issue_data)
+                self.on_epic_loaded(epic, old_epic.tasks + old_epic.stories)
+                self.publish_epics({epic_key: epic})
+                self.publish_snapshot({epic_key: epic})
 
             logger.info(f"Saved {len(issue_data)} issues to {file_path}")
+            metrics.epic_refresh_duration.observe(time.perf_counter() - refresh_start, result="success")
         except Exception as e:
             logger.exception(f"Failed to dump {full_key}: {e}")
+            metrics.epic_refresh_duration.observe(time.perf_counter() - refresh_start, result="error")
+
+
+    def apply_webhook_event(self, payload):
+        """
+        Applies one Jira webhook event (issue created, updated or deleted, comment created, updated or deleted)
+        to the dump file and the in-memory epic of the issue, only that issue is rebuilt and reindexed.
+        An issue whose epic link changed is moved out of the epic that held it, into the new one if it is loaded.
+        Returns "applied", "ignored" if the issue is not in a loaded epic, or "unsupported".
+        """
+        event = payload.get("webhookEvent", "")
+        issue = payload.get("issue") or {}
+        issue_key = issue.get("key")
+        if event not in WEBHOOK_ISSUE_EVENTS + WEBHOOK_COMMENT_EVENTS or not issue_key:
+            return "unsupported"
+
+        with self.refresh_guard(), self.epic_update_lock:
+            fields = issue.get("fields") or {}
+            linked_key = self.webhook_epic_link(fields)
+            holder_key = self.find_issue_epic(issue_key, linked_key)
+            if linked_key is False:
+                epic_key = holder_key
+            else:
+                epic_key = linked_key if linked_key in self.epics else None
+            if holder_key is None and (epic_key is None or event == "jira:issue_deleted"):
+                return "ignored"
+
+            updates = {} # epic key -> (dump records, new epic), the epic the issue leaves comes first
+            record = None
+            if holder_key is not None and holder_key != epic_key:
+                records = self.load_dump_records(holder_key)
+                record = next((record for record in records if record.get("key") == issue_key), None)
+                updates[holder_key] = (
+                    [record for record in records if record.get("key") != issue_key],
+                    self.epics[holder_key].replace_issue(issue_key)
+                )
+
+            if epic_key is not None:
+                records = self.load_dump_records(epic_key)
+                position = next((i for i, record in enumerate(records) if record.get("key") == issue_key), None)
+                if position is not None:
+                    record = records[position]
+
+                if event == "jira:issue_deleted":
+                    record = None
+                elif event in WEBHOOK_ISSUE_EVENTS:
+                    record = self.merge_webhook_issue(record, payload)
+                elif record is None:
+                    return "ignored"
+                else:
+                    record = self.merge_webhook_comment(record, event, payload.get("comment") or {})
+
+                if record is None:
+                    if position is not None:
+                        del records[position]
+                elif position is None:
+                    records.append(record)
+                else:
+                    records[position] = record
+
+                # build the issue before touching the dumps, a record that does not parse leaves them unchanged
+                updates[epic_key] = (records, self.epics[epic_key].replace_issue(issue_key, record))
+
+            for key, (records, epic) in updates.items():
+                self.write_dump_records(key, records)
+
+            # unindexed from the epic it leaves before it is indexed under the new one
+            for key, (records, epic) in updates.items():
+                old_epic = self.epics[key]
+                self.on_epic_loaded(epic, old_epic.tasks + old_epic.stories)
+            new_epics = {key: epic for key, (records, epic) in updates.items()}
+            self.publish_epics(new_epics)
+            self.publish_snapshot(new_epics)
+
+        logger.info(f"Applied {event} for {issue_key} in {', '.join(updates)}")
+        return "applied"
+
+
+    def webhook_epic_link(self, fields):
+        #the epic key the event links the issue to, None if it has no epic, False if the event leaves the link out
+        if "customfield_10014" not in fields and "parent" not in fields:
+            return False
+        return fields.get("customfield_10014") or (fields.get("parent") or {}).get("key")
+
+
+    def find_issue_epic(self, issue_key, epic_key=None):
+        #returns the key of the loaded epic holding the issue, looking in epic_key first, or None
+        epics = self.epics
+        if epic_key in epics and any(issue.key == issue_key for issue in epics[epic_key].tasks + epics[epic_key].stories):
+            return epic_key
+
+        for key, epic in epics.items():
+            if any(issue.key == issue_key for issue in epic.tasks + epic.stories):
+                return key
+        return None
+
+
+    def load_dump_records(self, epic_key):
+        file_path = os.path.join(self.data_directory, f"{epic_key}.json")
+        if not os.path.exists(file_path):
+            return []
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+    def write_dump_records(self, epic_key, records):
+        file_path = os.path.join(self.data_directory, f"{epic_key}.json")
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, file_path)
+
+
+    def merge_webhook_issue(self, record, payload):
+        #returns the issue record updated with the fields and the status change of an issue event
+        fields = payload["issue"].get("fields") or {}
+        new_fields = normalize_issue({"key": payload["issue"]["key"], "fields": fields})["fields"]
+
+        if record is None:
+            if not fields.get("created") or not fields.get("summary"):
+                return None
+            record = {"key": payload["issue"]["key"], "fields": new_fields, "changelog": {"histories": []}}
+        else:
+            # webhooks can leave fields out, only the ones in the payload replace the stored values
+            record = {**record, "fields": {**record["fields"], **{name: value for name, value in new_fields.items() if name in fields}}}
+
+        changelog = payload.get("changelog") or {}
+        status_items = [
+            {"field": "status", "fromString": item.get("fromString"), "toString": item.get("toString")}
+            for item in changelog.get("items", []) if item.get("field") == "status"
+        ]
+        histories = record.get("changelog", {}).get("histories", [])
+        if status_items and all(history.get("id") != changelog.get("id") for history in histories):
+            # the issue's updated time is in the Jira user's time zone, like the dumped changelog
+            changed = fields.get("updated") or datetime.fromtimestamp(
+                payload.get("timestamp", time.time() * 1000) / 1000, timezone.utc
+            ).astimezone().strftime("%Y-%m-%dT%H:%M:%S.000%z")
+            record["changelog"] = {"histories": histories + [{
+                "id": changelog.get("id"),
+                "author": {"displayName": (payload.get("user") or {}).get("displayName")},
+                "created": changed,
+                "items": status_items
+            }]}
+
+        return record
+
+
+    def merge_webhook_comment(self, record, event, comment):
+        #returns the issue record with the comment of a comment event added, replaced or removed
+        comments = [c for c in record["fields"].get("comment", {}).get("comments", []) if c.get("id") != comment.get("id")]
+        if event != "comment_deleted":
+            comments.append(normalize_comment(comment))
+        return {**record, "fields": {**record["fields"], "comment": {"comments": comments}}}
+
+
+    def build_board_issue_fields(self, board_data):
+        #returns (epic_key, serial, fields) for a new hashboard task, or None if required board data is missing
+        epic_key = full_rt(board_data.get("epicKey", "")).strip()
+        board_model = board_data.get("boardModel", "").strip()
+        frequency = board_data.get("frequency", "").strip()
+        hashrate = board_data.get("hashRate", "").strip()
+        serial = board_data.get("serial", "").strip()
+
+        if not all([epic_key, board_model, frequency, hashrate, serial]):
+            logger.warning("Missing required board data fields.")
+            return None
+
+        fields = {
+            "project": {"key": "RT"},
+            "summary": serial,
+            "issuetype": {"name": "Task"},
+            "customfield_10014": epic_key,  # ← Epic Link
+            "customfield_10153": hashrate,  # Hashrate
+        }
+
+        # Set model if valid
+        if board_model in VALID_BOARD_MODELS:
+            fields["customfield_10230"] = {"value": board_model}
+        else:
+            logger.warning(f"Invalid board model '{board_model}' — not added to issue.")
+
+        # Frequency if present
+        if frequency:
+            fields["customfield_10229"] = frequency
+
+        return epic_key, serial, fields
 
 
     def create_issue_if_not_exists(self, board_data):
         try:
-            epic_key = full_rt(board_data.get("epicKey", "")).strip()
-            board_model = board_data.get("boardModel", "").strip()
-            frequency = board_data.get("frequency", "").strip()
-            hashrate = board_data.get("hashRate", "").strip()
-            serial = board_data.get("serial", "").strip()
-
-            if not all([epic_key, board_model, frequency, hashrate, serial]):
-                logger.warning("Missing required board data fields.")
+            board_issue = self.build_board_issue_fields(board_data)
+            if board_issue is None:
                 return False
+            epic_key, serial, fields = board_issue
 
             # Check if issue already exists
             jql = f'"Epic Link" = "{epic_key}" AND summary ~ "{serial}" AND issuetype = Task'
@@ -298,31 +742,6 @@ class JiraWrapper:
                 logger.info(f"Issue with serial '{serial}' already exists in epic '{epic_key}'.")
                 return False
 
-            # Only valid models are allowed
-            valid_board_models = {
-                "NBS1906", "BHB42831", "NBP1901", "BHB42603", "BHB42631", "BHB42841",
-                "BHB42601", "BHB56801", "BHB42621", "BHB42651", "BHB56903", "BHB68606",
-                "BHB68603", "A3HB70601", "BHB68701"
-            }
-
-            fields = {
-                "project": {"key": "RT"},
-                "summary": serial,
-                "issuetype": {"name": "Task"},
-                "customfield_10014": epic_key,  # ← Epic Link
-                "customfield_10153": hashrate,  # Hashrate
-            }
-
-            # Set model if valid
-            if board_model in valid_board_models:
-                fields["customfield_10230"] = {"value": board_model}
-            else:
-                logger.warning(f"Invalid board model '{board_model}' — not added to issue.")
-
-            # Frequency if present
-            if frequency:
-                fields["customfield_10229"] = frequency
-
             new_issue = self.jira.create_issue(fields=fields)
             logger.info(f"Created issue {new_issue.key} for board serial '{serial}'")
             return True
@@ -330,3 +749,84 @@ class JiraWrapper:
         except Exception as e:
             logger.exception(f"Failed to create issue: {e}")
             return False
+
+
+    def create_issues_bulk(self, fields_list, chunk_size=50, max_retries=5):
+        """
+        Creates issues through the v3 bulk create endpoint, chunk_size issues per request (Jira allows up to 50).
+        Returns a list in the same order as fields_list of {"key": ...} or {"error": ...} entries.
+        """
+        results = []
+        url = f"{self.server}/rest/api/3/issue/bulk"
+
+        for i in range(0, len(fields_list), chunk_size):
+            chunk = fields_list[i:i + chunk_size]
+            chunk_results = [{"error": "No response from Jira"} for _ in chunk]
+            retries = 0
+
+            while True:
+                self.throttle()
+
+                try:
+                    response = self.send_jira_request(
+                        "bulk_create", "POST", url,
+                        json={"issueUpdates": [{"fields": fields} for fields in chunk]},
+                        auth=HTTPBasicAuth(self.email, self.token),
+                        verify=self.root_cert if self.root_cert else True
+                    )
+
+                    if response.status_code == 429:
+                        retry_after = int(response.headers.get('Retry-After', 10))
+                        logger.warning(f"[Retry {retries+1}/{max_retries}] 429 Too Many Requests - Backing off for {retry_after} seconds...")
+                        time.sleep(retry_after)
+                        retries += 1
+                        metrics.jira_retries.inc(endpoint="bulk_create")
+                        if retries > max_retries:
+                            logger.warning("Max retries reached.")
+                            break
+                        continue
+
+                    # a partially failed bulk create answers 400 with both the created issues and the errors
+                    data = response.json() if response.content else {}
+                    if response.status_code >= 400 and not data.get("errors"):
+                        response.raise_for_status()
+
+                    failed = {}
+                    for error in data.get("errors", []):
+                        element_errors = error.get("elementErrors", {})
+                        message = "; ".join(element_errors.get("errorMessages", []) + [
+                            f"{name}: {value}" for name, value in element_errors.get("errors", {}).items()
+                        ])
+                        failed[error.get("failedElementNumber")] = message or f"HTTP {error.get('status')}"
+
+                    created = iter(data.get("issues", []))
+                    for index in range(len(chunk)):
+                        if index in failed:
+                            chunk_results[index] = {"error": failed[index]}
+                        else:
+                            issue = next(created, None)
+                            if issue is not None:
+                                chunk_results[index] = {"key": issue["key"]}
+                    break
+
+                except requests.exceptions.HTTPError as e:
+                    logger.error(f"Bulk create failed: {e}")
+                    chunk_results = [{"error": str(e)} for _ in chunk]
+                    break
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"Request error: {e}")
+                    retries += 1
+                    metrics.jira_retries.inc(endpoint="bulk_create")
+                    if retries > max_retries:
+                        logger.warning("Max retries reached.")
+                        chunk_results = [{"error": str(e)} for _ in chunk]
+                        break
+                    time.sleep(2 ** retries)  # Exponential backoff
+                except ValueError as e:
+                    logger.error(f"Invalid bulk create response: {e}")
+                    chunk_results = [{"error": "Invalid response from Jira"} for _ in chunk]
+                    break
+
+            results.extend(chunk_results)
+
+        return results
@@ -1,10 +1,15 @@
-from flask import Flask, flash, make_response, session, redirect, url_for, render_template, request, jsonify, Response
+from flask import Flask, flash, make_response, session, redirect, url_for, render_template, request, jsonify, Response, g
 from flask_cors import CORS
 from dotenv import load_dotenv
-import os, json, time
+import os, gc, json, time, hmac, hashlib
+from datetime import datetime
 
 from JiraClient import JiraClient
+from writeQueue import BoardWriteQueue
+from profiling import RequestProfiler
+import columnarExport
 from helper import logger
+import metrics
 
 app = Flask(__name__)
 CORS(app)
@@ -15,6 +20,110 @@ DEBUG = os.getenv('DEBUG', False)
 
 client = JiraClient()
 
+# with SHARED_SNAPSHOT, run gunicorn with --preload: the workers fork after the epics are loaded and share them
+# copy-on-write, freezing keeps the garbage collector from touching (and so copying) every one of those objects.
+# each worker only decodes its own copy of the epics changed after the fork, from the shared snapshot
+if client.snapshot_store is not None:
+    gc.freeze()
+
+# arc tester writes are journaled and replayed in the background, the debug reloader parent does not replay.
+# every worker starts the queue but only the one holding its leader lock replays it
+write_queue = BoardWriteQueue(client, os.getenv('WRITE_QUEUE_DB', os.path.join(client.data_directory, 'write_queue.db')))
+if not DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    write_queue.start()
+
+metrics.Gauge("resident_epics", "Epics currently loaded in memory.", callback=lambda: len(client.epics))
+metrics.Gauge("write_queue_pending", "Board writes waiting in the write-behind queue.", callback=write_queue.pending_count)
+
+# seconds between keepalive comments on the timeline event streams
+TIMELINE_KEEPALIVE = float(os.getenv('TIMELINE_KEEPALIVE', 15))
+# seconds a timeline event stream stays open, the browser then reconnects and starts from a new snapshot
+TIMELINE_STREAM_LIFETIME = float(os.getenv('TIMELINE_STREAM_LIFETIME', 600))
+
+# shared secret of the Jira webhook, when set every event must carry its X-Hub-Signature
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+
+# on-demand cProfile of single requests, only requests carrying PROFILE_TOKEN are ever profiled
+profiler = RequestProfiler(
+    token=os.getenv('PROFILE_TOKEN'),
+    sample_rate=float(os.getenv('PROFILE_SAMPLE_RATE', 1.0)),
+    directory=os.getenv('PROFILE_DIR', 'profiles')
+)
+
+
+@app.before_request
+def sync_shared_snapshot():
+    # picks up refreshes done by other server workers, a no-op without SHARED_SNAPSHOT
+    client.sync_snapshot()
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.before_request
+def start_request_profile():
+    if profiler.should_profile(request):
+        profile = profiler.start()
+        if profile is not None:
+            g.request_profile = profile
+
+
+@app.after_request
+def finish_request_profile(response):
+    profile = g.pop('request_profile', None)
+    if profile is None:
+        return response
+
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    data = request.get_json(silent=True) if request.is_json else None
+    data = data if isinstance(data, dict) else {}
+    epic_key = (request.args.get('rt') or request.args.get('epic_key')
+                or data.get('rt_number') or data.get('epic_key') or data.get('epic-key'))
+
+    if not response.is_streamed:
+        profiler.finish(profile, route, epic_key)
+        return response
+
+    # streamed responses do their work while the body is sent, so the profile runs until the last chunk
+    body = response.response
+    def profiled_body():
+        try:
+            yield from body
+        finally:
+            profiler.finish(profile, route, epic_key)
+
+    response.response = profiled_body()
+    return response
+
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    labels = {"route": route, "method": request.method, "status": str(response.status_code)}
+    request_start = g.get('request_start', time.perf_counter())
+
+    if not response.is_streamed:
+        metrics.http_request_duration.observe(time.perf_counter() - request_start, **labels)
+        metrics.http_response_size.observe(response.calculate_content_length() or 0, route=route)
+        return response
+
+    # streamed responses are measured when the last chunk has been sent
+    body = response.response
+    def measured_body():
+        size = 0
+        try:
+            for chunk in body:
+                size += len(chunk)
+                yield chunk
+        finally:
+            metrics.http_request_duration.observe(time.perf_counter() - request_start, **labels)
+            metrics.http_response_size.observe(size, route=route)
+
+    response.response = measured_body()
+    return response
+
 
 #--------------------------------------------------------------------------------------
 # Routes
@@ -61,6 +170,12 @@ def api_update_issues():
     return Response(generate_data(), mimetype='application/x-ndjson')
 
 
+@app.route('/api/ready', methods=['GET'])
+def api_ready():
+    readiness = client.get_readiness()
+    return jsonify(readiness), 200 if readiness['ready'] else 503
+
+
 @app.route('/api/get_orders')
 def api_get_orders():
     try:
@@ -87,6 +202,201 @@ def api_get_repair_times():
         return jsonify({"error": "Internal server error"}), 500
 
 
+@app.route('/api/get_repair_analytics', methods=['POST'])
+def api_get_repair_analytics():
+    try:
+        data = request.get_json(silent=True) or {}
+        rt_number = data.get('rt_number')
+        business_hours = bool(data.get('business_hours', False))
+
+        if rt_number and rt_number not in client.epics:
+            return jsonify({"error": f"Epic {rt_number} not found"}), 404
+
+        return jsonify(client.get_repair_analytics(rt_number, business_hours))
+
+    except Exception as e:
+        logger.error(f"Error in /api/get_repair_analytics: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/get_dwell_analytics', methods=['POST'])
+def api_get_dwell_analytics():
+    try:
+        data = request.get_json(silent=True) or {}
+        rt_number = data.get('rt_number')
+        statuses = data.get('statuses')
+        business_hours = bool(data.get('business_hours', False))
+
+        if rt_number and rt_number not in client.epics:
+            return jsonify({"error": f"Epic {rt_number} not found"}), 404
+        if statuses is not None and not isinstance(statuses, list):
+            return jsonify({"error": "statuses must be a list"}), 400
+
+        return jsonify(client.get_dwell_analytics(rt_number, set(statuses) if statuses else None, business_hours))
+
+    except Exception as e:
+        logger.error(f"Error in /api/get_dwell_analytics: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/query_boards', methods=['POST'])
+def api_query_boards():
+    try:
+        data = request.get_json(silent=True) or {}
+        filters = {field: data[field] for field in ('board_model', 'status', 'assignee') if data.get(field)}
+        if data.get('rt_number'):
+            filters['epic_key'] = data['rt_number']
+
+        date_field = data.get('date_field', 'created')
+        if date_field not in ('created', 'status_changed'):
+            return jsonify({"error": "date_field must be 'created' or 'status_changed'"}), 400
+        try:
+            date_from = datetime.strptime(data['date_from'], "%Y-%m-%d").date() if data.get('date_from') else None
+            date_to = datetime.strptime(data['date_to'], "%Y-%m-%d").date() if data.get('date_to') else None
+            limit = int(data.get('limit', 1000))
+        except (TypeError, ValueError):
+            return jsonify({"error": "date_from and date_to must be YYYY-MM-DD and limit a number"}), 400
+
+        return jsonify(client.query_boards(
+            filters, date_from, date_to, date_field, bool(data.get('open_orders', False)), limit
+        ))
+
+    except Exception as e:
+        logger.error(f"Error in /api/query_boards: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/get_technician_workload', methods=['POST'])
+def api_get_technician_workload():
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            date_from = datetime.strptime(data['date_from'], "%Y-%m-%d").date() if data.get('date_from') else None
+            date_to = datetime.strptime(data['date_to'], "%Y-%m-%d").date() if data.get('date_to') else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "date_from and date_to must be YYYY-MM-DD"}), 400
+
+        technicians = data.get('technicians')
+        statuses = data.get('statuses')
+        return jsonify(client.get_technician_workload(
+            date_from, date_to, set(technicians) if technicians else None, set(statuses) if statuses else None
+        ))
+
+    except Exception as e:
+        logger.error(f"Error in /api/get_technician_workload: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+def csv_response(lines, filename):
+    response = Response(lines, mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+@app.route('/api/export/order_summaries.csv', methods=['GET'])
+def api_export_order_summaries():
+    return csv_response(client.order_summaries_csv(), 'order_summaries.csv')
+
+
+@app.route('/api/export/issue_summaries.csv', methods=['GET'])
+def api_export_issue_summaries():
+    epic_key = request.args.get('rt')
+    if not epic_key:
+        return jsonify({'error': 'rt parameter is required'}), 400
+    if epic_key not in client.epics:
+        return jsonify({'error': f'Unknown epic {epic_key}'}), 404
+    return csv_response(client.issue_summaries_csv(epic_key), f'{epic_key}_issue_summaries.csv')
+
+
+@app.route('/api/export/repair_data.csv', methods=['GET'])
+def api_export_repair_data():
+    epic_key = request.args.get('rt')
+    if not epic_key:
+        return jsonify({'error': 'rt parameter is required'}), 400
+    if epic_key not in client.epics:
+        return jsonify({'error': f'Unknown epic {epic_key}'}), 404
+    return csv_response(client.repair_data_csv(epic_key), f'{epic_key}_repair_data.csv')
+
+
+@app.route('/api/export_columnar', methods=['GET'])
+def api_export_columnar():
+    table = request.args.get('table', 'issues')
+    if table not in columnarExport.TABLES:
+        return jsonify({'error': f'table must be one of {", ".join(columnarExport.TABLES)}'}), 400
+    if columnarExport.pa is None:
+        return jsonify({'error': 'pyarrow is not installed on the server'}), 501
+
+    epics = client.epics
+    epic_keys = request.args.getlist('rt')
+    missing = [key for key in epic_keys if key not in epics]
+    if missing:
+        return jsonify({'error': f'Unknown epics {", ".join(missing)}'}), 404
+    if epic_keys:
+        epics = {key: epics[key] for key in epic_keys}
+
+    response = Response(columnarExport.stream_table(epics, table), mimetype=columnarExport.ARROW_STREAM_MIMETYPE)
+    response.headers['Content-Disposition'] = f'attachment; filename={table}.arrows'
+    return response
+
+
+@app.route('/api/timeline_events', methods=['GET'])
+def api_timeline_events():
+    epic_key = request.args.get('rt')
+    if not epic_key:
+        return jsonify({'error': 'rt parameter is required'}), 400
+    if epic_key not in client.epics:
+        return jsonify({'error': f'Unknown epic {epic_key}'}), 404
+
+    try:
+        subscription, snapshot = client.subscribe_timeline(epic_key)
+    except Exception as e:
+        logger.error(f"Error in /api/timeline_events: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+    if subscription is None:
+        return jsonify({'error': 'Too many open timeline streams'}), 503, {'Retry-After': '60'}
+
+    def generate_events():
+        # starts with the current counts, then one delta event per load that changed the epic
+        try:
+            yield 'retry: 5000\n'
+            yield f'event: snapshot\ndata: {json.dumps(snapshot, default=str)}\n\n'
+            close_at = time.monotonic() + TIMELINE_STREAM_LIFETIME
+            while time.monotonic() < close_at:
+                event = subscription.get(timeout=min(TIMELINE_KEEPALIVE, max(close_at - time.monotonic(), 0)))
+                if subscription.overflowed:
+                    yield 'event: reset\ndata: {}\n\n'
+                    return
+                if event is None:
+                    # picks up refreshes of other workers while no request comes in, the comment keeps proxies open
+                    client.sync_snapshot()
+                    yield ': keepalive\n\n'
+                    continue
+                yield f'event: delta\ndata: {json.dumps(event, default=str)}\n\n'
+        finally:
+            client.timeline_events.unsubscribe(subscription)
+
+    response = Response(generate_events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/api/search_notes', methods=['GET'])
+def api_search_notes():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q parameter is required'}), 400
+
+    try:
+        limit = int(request.args.get('limit', 20))
+        return jsonify(client.search_repair_notes(query, request.args.get('rt') or None, limit))
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    except Exception as e:
+        logger.error(f"Error in /api/search_notes: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
 @app.route('/api/get_all_issue_summaries', methods=['POST'])
 def api_get_all_issue_summaries():
     try:
@@ -124,7 +434,11 @@ def api_update_board():
         if not board_data:
             return jsonify({"error": "Missing board data"}), 400
 
-        client.update_jira_with_board_data(board_data)
+        if not board_data.get("serial") or not board_data.get("boardModel"):
+            logger.warning(f"Missing serial or board model in {board_data}. Skipping update.")
+            return "OKAY", 200
+
+        write_queue.enqueue("update", board_data)
 
         return "OKAY", 200
 
@@ -134,6 +448,22 @@ def api_update_board():
     
 
 
+@app.route('/api/update_boards', methods=['POST'])
+def api_update_boards():
+    try:
+        board_records = request.json
+        if not board_records or not isinstance(board_records, list):
+            return jsonify({"error": "Missing list of board data"}), 400
+
+        results = client.update_jira_with_board_data_batch(board_records)
+
+        return jsonify({"results": results})
+
+    except Exception as e:
+        logger.error(f"Error in /api/update_boards: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @app.route('/api/create_board', methods=['POST'])
 def update_board():
     try:
@@ -141,19 +471,53 @@ def update_board():
         if not board_data:
             return jsonify({"error": "Missing board data"}), 400
 
-        result = client.create_issue_if_not_exists(board_data)
+        board_issue = client.build_board_issue_fields(board_data)
+        if board_issue is None:
+            return "NOT OKAY", 200
 
-        if result:
-            return "OKAY", 200
-        else:
+        # a quick local answer for boards this worker knows, the write queue checks Jira again before creating
+        epic_key, serial, _ = board_issue
+        if client.serial_exists_in_epic(serial, epic_key):
+            logger.info(f"Issue with serial '{serial}' already exists in epic '{epic_key}'.")
             return "NOT OKAY", 200
 
+        # the issue is created by the write queue, 202 tells the caller it is not in Jira yet
+        write_queue.enqueue("create", board_data)
+
+        return "QUEUED", 202
+
     except Exception as e:
         print(f"Error in /update_board: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
 
 
+@app.route('/api/create_boards', methods=['POST'])
+def api_create_boards():
+    try:
+        board_records = request.json
+        if not board_records or not isinstance(board_records, list):
+            return jsonify({"error": "Missing list of board data"}), 400
+
+        results = client.create_issues_if_not_exist(board_records)
+
+        return jsonify({"results": results})
+
+    except Exception as e:
+        logger.error(f"Error in /api/create_boards: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+
+@app.route('/api/get_write_queue', methods=['GET'])
+def api_get_write_queue():
+    try:
+        return jsonify(write_queue.get_status())
+    except Exception as e:
+        logger.error(f"Error in /api/get_write_queue: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @app.route('/api/get_timeline', methods=['GET'])
 def api_get_timeline():
     rt_key = str(request.args.get('rt'))
@@ -167,6 +531,34 @@ def api_get_timeline():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/get_timeline_counts', methods=['GET'])
+def api_get_timeline_counts():
+    rt_key = request.args.get('rt')
+    if not rt_key:
+        return jsonify({'error': 'RT number is required'}), 400
+    if rt_key not in client.epics:
+        return jsonify({'error': f'Epic {rt_key} not found'}), 404
+
+    try:
+        return jsonify(client.create_epic_count_timeline_data(rt_key))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/get_timelines', methods=['POST'])
+def api_get_timelines():
+    data = request.get_json(silent=True) or {}
+    rt_keys = data.get('rt_numbers')
+    if not rt_keys or not isinstance(rt_keys, list):
+        return jsonify({'error': 'rt_numbers list is required'}), 400
+
+    def generate_data():
+        for epic_data in client.create_epic_timelines_data([str(key) for key in rt_keys]):
+            yield json.dumps(epic_data, default=str) + '\n'
+
+    return Response(generate_data(), mimetype='application/x-ndjson')
+
+
 @app.route('/api/get_all_summaries', methods=['GET'])
 def get_all_summaries():
     try:
@@ -195,6 +587,19 @@ def api_get_holidays():
         return jsonify({'error': 'error in get_holidays'})
 
 
+@app.route('/api/get_board_lifecycle', methods=['GET'])
+def api_get_board_lifecycle():
+    try:
+        serial = request.args.get('serial', '').strip()
+        if not serial:
+            return jsonify({'error': 'serial parameter is required'}), 400
+
+        return jsonify(client.get_board_lifecycle(serial))
+    except Exception as e:
+        logger.error(f"Error in /api/get_board_lifecycle: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
 @app.route('/api/get_duplicate_serials', methods=['GET'])
 def api_get_duplicate_serials():
     try:
@@ -209,6 +614,36 @@ def api_get_duplicate_serials():
         return jsonify({'error': 'Internal server error'}), 500
 
 
+# sample payloads of every handled event are in webhook_samples/, replay one with
+#   curl -X POST -H "Content-Type: application/json" -d @webhook_samples/jira_issue_created.json <host>/api/jira_webhook
+@app.route('/api/jira_webhook', methods=['POST'])
+def api_jira_webhook():
+    if WEBHOOK_SECRET:
+        expected = 'sha256=' + hmac.new(WEBHOOK_SECRET.encode(), request.get_data(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, request.headers.get('X-Hub-Signature', '')):
+            return jsonify({'error': 'invalid signature'}), 401
+
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'JSON body is required'}), 400
+
+    event = payload.get('webhookEvent', 'unknown')
+    try:
+        result = client.apply_webhook_event(payload)
+        # unsupported event names come from the sender, keep them out of the metric labels
+        metrics.jira_webhook_events.inc(event=event if result != 'unsupported' else 'other', result=result)
+        return jsonify({'result': result})
+    except Exception as e:
+        metrics.jira_webhook_events.inc(event=event, result='error')
+        logger.error(f"Error in /api/jira_webhook: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
 #--------------------------------------------------------------------------------------
 
 @app.route('/favicon.ico')
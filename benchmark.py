@@ -0,0 +1,297 @@
+import argparse, json, os, platform, random, statistics, sys, tempfile, time, tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from issueWrapper import Epic
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Benchmark suite
+#-----------------------------------------------------------------------------------------------------------
+# runs the epic loading and reporting hot paths against synthetic epics and writes the results as JSON.
+# with --baseline, exits with status 1 if a benchmark got slower or bigger than the baseline allows:
+#
+#   python benchmark.py --output bench.json
+#   python benchmark.py --baseline bench.json --max-time-regression 0.25
+
+BOARD_MODELS = ["BHB68606", "BHB68603", "BHB56903", "BHB42831"]
+TECHNICIANS = ["Alex Rivera", "Sam Chen", "Jordan Lee", "Taylor Brooks", "Morgan Diaz"]
+COMMENT_WORDS = ["replaced", "asic", "reflowed", "chip", "domain", "voltage", "short", "sensor", "no", "hashrate",
+                 "retested", "connector", "cleaned", "thermal", "paste", "heatsink", "open", "circuit", "ok", "low"]
+
+JIRA_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000%z"
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Synthetic data
+#-----------------------------------------------------------------------------------------------------------
+
+def jira_time(timestamp):
+    return timestamp.strftime(JIRA_TIME_FORMAT)
+
+
+def comment_body(text):
+    return {"type": "doc", "version": 1, "content": [{"type": "paragraph", "content": [{"type": "text", "text": text}]}]}
+
+
+def board_status_path(rnd, status_changes):
+    #a board goes through diagnosis, then repair cycles until it passes, scraps, or runs out of status changes
+    path = ["Passed Initial Diagnosis"]
+    if rnd.random() < 0.3:
+        return path + ["Done"]
+
+    while len(path) < status_changes - 1:
+        if rnd.random() < 0.05:
+            return path + ["Scrap"]
+        path += ["Awaiting Advanced Repair", "Advanced Repair", "Awaiting Functional Test"]
+        if rnd.random() < 0.7:
+            break
+    return path[:status_changes - 1] + ["Done"]
+
+
+def generate_issue(rnd, key, serial, issue_type, created, statuses, comments, fields):
+    histories = []
+    previous_status = "Backlog"
+    timestamp = created
+    for history_id, status in enumerate(statuses):
+        timestamp += timedelta(hours=rnd.randint(1, 30), minutes=rnd.randint(0, 59))
+        histories.append({
+            "id": str(history_id),
+            "author": {"displayName": rnd.choice(TECHNICIANS)},
+            "created": jira_time(timestamp),
+            "items": [
+                {"field": "status", "fieldtype": "jira", "fromString": previous_status, "toString": status},
+                {"field": "assignee", "fieldtype": "jira", "fromString": None, "toString": rnd.choice(TECHNICIANS)}
+            ]
+        })
+        previous_status = status
+
+    comment_list = []
+    for _ in range(comments):
+        comment_time = created + timedelta(hours=rnd.randint(1, 24 * max(1, len(statuses))))
+        text = " ".join(rnd.choice(COMMENT_WORDS) for _ in range(rnd.randint(4, 16)))
+        comment_list.append({"author": {"displayName": rnd.choice(TECHNICIANS)}, "created": jira_time(comment_time),
+                             "body": comment_body(text)})
+
+    return {
+        "key": key,
+        "fields": {
+            "summary": serial,
+            "created": jira_time(created),
+            "issuetype": {"name": issue_type},
+            "assignee": {"displayName": rnd.choice(TECHNICIANS)},
+            "comment": {"comments": comment_list, "total": len(comment_list)},
+            **fields
+        },
+        "changelog": {"histories": histories}
+    }
+
+
+def generate_epic_issues(rnd, epic_index, start_date, boards, chassis, status_changes, comments):
+    #returns the raw issues of one epic, in the shape search_issues_v3 returns them
+    issues = []
+    board_keys = []
+    for board in range(boards):
+        key = f"RT-{epic_index * 100000 + board + 1}"
+        board_keys.append(key)
+        created = start_date + timedelta(hours=rnd.randint(0, 72))
+        issues.append(generate_issue(
+            rnd, key, f"S{epic_index:03d}{board:06d}", "Task", created,
+            board_status_path(rnd, status_changes), rnd.randint(0, comments),
+            {
+                "customfield_10245": "swapped asic\nreflowed domain" if rnd.random() < 0.5 else None,
+                "customfield_10230": {"value": rnd.choice(BOARD_MODELS)},
+                "customfield_10229": str(rnd.choice([490, 525, 550])),
+                "customfield_10153": f"{rnd.uniform(60, 120):.1f}",
+                "issuelinks": []
+            }
+        ))
+
+    for chassis_index in range(chassis):
+        key = f"RT-{epic_index * 100000 + boards + chassis_index + 1}"
+        created = start_date + timedelta(hours=rnd.randint(0, 72))
+        linked = rnd.sample(board_keys, min(3, len(board_keys)))
+        issues.append(generate_issue(
+            rnd, key, f"C{epic_index:03d}{chassis_index:05d}", "Story", created,
+            ["In Progress", "Ready to Ship", "Done"][:rnd.randint(1, 3)], rnd.randint(0, comments),
+            {"issuelinks": [{"outwardIssue": {"key": linked_key}} for linked_key in linked]}
+        ))
+
+    return issues
+
+
+def generate_dataset(epics, boards, chassis, status_changes, comments, seed):
+    #returns (epic metadata, {epic key: raw issues})
+    rnd = random.Random(seed)
+    metadata = []
+    raw_issues = {}
+    for epic_index in range(epics):
+        key = f"RT-{90000 + epic_index}"
+        start_date = datetime(2025, 1, 6, 8, tzinfo=timezone(timedelta(hours=-6))) + timedelta(days=7 * epic_index)
+        metadata.append({"key": key, "fields": {"summary": f"Benchmark order {epic_index}", "created": jira_time(start_date)}})
+        raw_issues[key] = generate_epic_issues(rnd, epic_index, start_date, boards, chassis, status_changes, comments)
+    return metadata, raw_issues
+
+
+def build_client(metadata, raw_issues, directory):
+    #a JiraClient loaded from synthetic dump files, it never talks to Jira
+    os.environ['LAZY_STARTUP'] = 'false'
+    os.environ['SHARED_SNAPSHOT'] = 'false'
+    from JiraClient import JiraClient
+
+    class BenchmarkClient(JiraClient):
+        def get_epics_from_jira(self):
+            return metadata
+
+    os.chdir(directory)
+    os.makedirs("jira_dumps", exist_ok=True)
+    with open(os.path.join("jira_dumps", "epic_prune.json"), "w") as f:
+        json.dump([], f)
+    for key, issues in raw_issues.items():
+        with open(os.path.join("jira_dumps", f"{key}.json"), "w", encoding="utf-8") as f:
+            json.dump(issues, f)
+
+    return BenchmarkClient()
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Runner
+#-----------------------------------------------------------------------------------------------------------
+
+def measure(function, repeat, setup=None):
+    #times repeat runs of function, then runs it once more under tracemalloc for the peak memory
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "runs": repeat,
+        "min_seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+        "max_seconds": max(timings),
+        "peak_memory_bytes": peak
+    }
+
+
+def run_benchmarks(client, metadata, raw_issues, repeat):
+    epics = list(client.epics.values())
+    start_dates = {epic_data["key"]: datetime.strptime(epic_data["fields"]["created"][:19], "%Y-%m-%dT%H:%M:%S")
+                   for epic_data in metadata}
+
+    def drop_summary_caches():
+        for epic in epics:
+            for issue in epic.tasks:
+                issue.invalidate_summary()
+
+    def repair_data():
+        for epic in epics:
+            for _ in client.get_repair_data_from_epic(epic.key):
+                pass
+
+    benchmarks = {
+        "Epic.from_json": (lambda: [Epic.from_json(key, "", start_dates[key], issues) for key, issues in raw_issues.items()], None),
+        "build_and_fill_epic_timeline": (lambda: [client.build_and_fill_epic_timeline(epic) for epic in epics], None),
+        "epic_end_date": (lambda: [client.epic_end_date(epic) for epic in epics], None),
+        "get_all_order_summaries": (client.get_all_order_summaries, None),
+        "get_repair_data_from_epic": (repair_data, drop_summary_caches),
+        "get_repair_data_from_epic (cached summaries)": (repair_data, None),
+    }
+
+    results = {}
+    for name, (function, setup) in benchmarks.items():
+        results[name] = measure(function, repeat, setup)
+        print(f"{name:<46} median {results[name]['median_seconds'] * 1000:9.2f} ms"
+              f"  peak {results[name]['peak_memory_bytes'] / 1024 / 1024:8.2f} MiB", file=sys.stderr)
+    return results
+
+
+def check_regressions(results, baseline, max_time_regression, max_memory_regression):
+    #returns one message per benchmark that is slower or bigger than the baseline allows
+    regressions = []
+    for name, baseline_result in baseline.get("benchmarks", {}).items():
+        result = results.get(name)
+        if result is None:
+            continue
+
+        time_limit = baseline_result["median_seconds"] * (1 + max_time_regression)
+        if result["median_seconds"] > time_limit:
+            regressions.append(f"{name}: median {result['median_seconds']:.4f}s exceeds {time_limit:.4f}s "
+                               f"(baseline {baseline_result['median_seconds']:.4f}s)")
+
+        memory_limit = baseline_result["peak_memory_bytes"] * (1 + max_memory_regression)
+        if result["peak_memory_bytes"] > memory_limit:
+            regressions.append(f"{name}: peak memory {result['peak_memory_bytes']} bytes exceeds {int(memory_limit)} bytes "
+                               f"(baseline {baseline_result['peak_memory_bytes']} bytes)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark epic loading and reporting on synthetic Jira data.")
+    parser.add_argument("--epics", type=int, default=5, help="number of epics")
+    parser.add_argument("--boards", type=int, default=400, help="hashboard tasks per epic")
+    parser.add_argument("--chassis", type=int, default=40, help="chassis stories per epic")
+    parser.add_argument("--status-changes", type=int, default=8, help="maximum status changes per board")
+    parser.add_argument("--comments", type=int, default=4, help="maximum comments per issue")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results as JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to check for regressions")
+    parser.add_argument("--max-time-regression", type=float, default=0.25, help="allowed median time increase, 0.25 = 25%%")
+    parser.add_argument("--max-memory-regression", type=float, default=0.10, help="allowed peak memory increase, 0.10 = 10%%")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    parameters = {"epics": args.epics, "boards": args.boards, "chassis": args.chassis,
+                  "status_changes": args.status_changes, "comments": args.comments, "seed": args.seed}
+    metadata, raw_issues = generate_dataset(args.epics, args.boards, args.chassis, args.status_changes, args.comments, args.seed)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="jira-benchmark-") as directory:
+        try:
+            client = build_client(metadata, raw_issues, directory)
+            results = run_benchmarks(client, metadata, raw_issues, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parameters": parameters,
+        "benchmarks": results
+    }
+
+    regressions = []
+    if baseline is not None:
+        if baseline.get("parameters") != parameters:
+            print("Warning: baseline was run with different parameters", file=sys.stderr)
+        regressions = check_regressions(results, baseline, args.max_time_regression, args.max_memory_regression)
+        report["regressions"] = regressions
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
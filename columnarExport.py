@@ -0,0 +1,208 @@
+import argparse, os, sys
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError: # optional, only the columnar export needs it
+    pa = None
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Columnar export
+#-----------------------------------------------------------------------------------------------------------
+# exports the loaded issues, status changes and comments as Parquet or Arrow IPC files, one directory per
+# table and one partition per epic, read from the in-memory epics a chunk of rows at a time:
+#
+#   python columnarExport.py --output export --format parquet
+#   python columnarExport.py --output export --format arrow --epic RT-101 --epic RT-102
+#
+# the files read back as one dataset with pyarrow.dataset.dataset("export/issues", partitioning="hive")
+
+TABLES = ("issues", "status_changes", "comments")
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+CHUNK_ROWS = 10000
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("the columnar export needs pyarrow, install it with: pip install pyarrow")
+
+
+def table_schema(table):
+    require_pyarrow()
+    timestamp = pa.timestamp("ms", tz="UTC")
+    common = [("epic_key", pa.string()), ("issue_key", pa.string()), ("serial", pa.string())]
+    columns = {
+        "issues": common + [
+            ("type", pa.string()), ("created", timestamp), ("assignee", pa.string()), ("current_status", pa.string()),
+            ("repair_summary", pa.string()), ("board_model", pa.string()), ("frequency", pa.string()),
+            ("hashrate", pa.string()), ("linked_issues", pa.list_(pa.string()))
+        ],
+        "status_changes": common + [
+            ("sequence", pa.int32()), ("author", pa.string()), ("from_status", pa.string()),
+            ("to_status", pa.string()), ("timestamp", timestamp)
+        ],
+        "comments": common + [("author", pa.string()), ("timestamp", timestamp), ("text", pa.string())]
+    }
+    return pa.schema(columns[table])
+
+
+def issue_rows(epic_key, issue, table):
+    #the rows of one issue in one table, as tuples in schema order
+    common = (epic_key, issue.key, issue.serial)
+    if table == "issues":
+        return [common + (
+            issue.type, issue.created, issue.assignee,
+            issue.status_history[-1].to_status if issue.status_history else None,
+            issue.repair_summary, getattr(issue, "board_model", None), getattr(issue, "frequency", None),
+            getattr(issue, "hashrate", None), getattr(issue, "linked_issues", None)
+        )]
+    if table == "status_changes":
+        return [
+            common + (i, change.author, change.from_status, change.to_status, change.timestamp)
+            for i, change in enumerate(issue.status_history)
+        ]
+    return [common + (comment.author, comment.timestamp, comment.text) for comment in issue.comments]
+
+
+def iter_record_batches(epics, table, chunk_rows=CHUNK_ROWS):
+    """
+    Yields (epic key, record batch) with at most chunk_rows rows, a batch never holds rows of two epics.
+    Only one chunk of rows is built at a time, whatever the number of epics.
+    """
+    schema = table_schema(table)
+    for epic_key, epic in epics.items():
+        rows = []
+        for issue in epic.tasks + epic.stories:
+            rows.extend(issue_rows(epic_key, issue, table))
+            if len(rows) >= chunk_rows:
+                yield epic_key, build_batch(schema, rows)
+                rows = []
+        if rows:
+            yield epic_key, build_batch(schema, rows)
+
+
+def build_batch(schema, rows):
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=schema.field(i).type) for i, column in enumerate(columns)], schema=schema
+    )
+
+
+def open_writer(path, schema, file_format):
+    if file_format == "parquet":
+        return pa.parquet.ParquetWriter(path, schema, compression="zstd")
+    return pa.ipc.new_file(path, schema)
+
+
+def write_partitioned(epics, directory, file_format="parquet", tables=TABLES, chunk_rows=CHUNK_ROWS):
+    #writes <directory>/<table>/epic_key=<key>/part-0<ext> for every epic with rows, returns the rows per table
+    require_pyarrow()
+    extension = FORMATS[file_format]
+    row_counts = {}
+
+    for table in tables:
+        schema = table_schema(table)
+        row_counts[table] = 0
+        writer, writer_epic = None, None
+        try:
+            for epic_key, batch in iter_record_batches(epics, table, chunk_rows):
+                if epic_key != writer_epic:
+                    if writer is not None:
+                        writer.close()
+                    partition = os.path.join(directory, table, f"epic_key={epic_key}")
+                    os.makedirs(partition, exist_ok=True)
+                    writer, writer_epic = open_writer(os.path.join(partition, "part-0" + extension), schema, file_format), epic_key
+                writer.write_batch(batch)
+                row_counts[table] += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+    return row_counts
+
+
+class ChunkSink:
+    """File-like sink the Arrow stream writer writes into, drained after every batch."""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_table(epics, table, chunk_rows=CHUNK_ROWS):
+    #yields one table as an Arrow IPC stream, one message per chunk of rows, the epic is the epic_key column
+    sink = ChunkSink()
+    writer = pa.ipc.new_stream(sink, table_schema(table))
+    yield sink.drain()
+    for _, batch in iter_record_batches(epics, table, chunk_rows):
+        writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def load_dumped_epics():
+    #every epic of the epic list cached by the last refresh, read from the dumps without connecting to Jira
+    os.environ['LAZY_STARTUP'] = 'false'
+    from JiraClient import JiraClient
+
+    class DumpClient(JiraClient):
+        def get_epics_from_jira(self):
+            return self.load_cached_epic_metadata()
+
+    client = DumpClient()
+    return client.epics if client.epic_metadata_source is not None else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the loaded epics as columnar files, partitioned by epic.")
+    parser.add_argument("--output", required=True, help="directory to write the tables to")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--table", action="append", choices=TABLES, help="table to export, all of them by default")
+    parser.add_argument("--epic", action="append", help="epic key to export, all loaded epics by default")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="maximum rows built in memory at once")
+    args = parser.parse_args(argv)
+
+    try:
+        require_pyarrow()
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    epics = load_dumped_epics()
+    if epics is None:
+        print("No cached epic list in jira_dumps, start the server once to fetch it from Jira", file=sys.stderr)
+        return 1
+    if args.epic:
+        missing = [key for key in args.epic if key not in epics]
+        if missing:
+            print(f"Epics not loaded: {', '.join(missing)}", file=sys.stderr)
+            return 1
+        epics = {key: epics[key] for key in args.epic}
+
+    row_counts = write_partitioned(epics, args.output, args.format, args.table or TABLES, args.chunk_rows)
+    for table, rows in row_counts.items():
+        print(f"{table}: {rows} rows from {len(epics)} epics")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-import logging
+import csv, logging
 from datetime import date, timedelta
 
 logging.basicConfig(
@@ -24,3 +24,34 @@ def full_rt(epic_key):
             return "RT-" + epic_key
         else:
             return epic_key
+
+
+def percentile(sorted_values, pct):
+    #linear interpolation between closest ranks, sorted_values must already be sorted
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class _EchoBuffer:
+    #csv.writer target that hands back each formatted line instead of storing it
+    def write(self, line):
+        return line
+
+
+def csv_cell(value):
+    #keeps spreadsheet programs from running cell text as a formula, numbers are written as they are
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return "" if value is None else value
+
+
+def csv_lines(header, rows):
+    #yields the header and then one CSV line per row as the rows are produced, nothing else is buffered
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([csv_cell(value) for value in row])
@@ -1,12 +1,104 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
+
+
+def extract_comment_text(comment_body):
+    """Extract plain text from a comment body, handling the Jira v3 API document format"""
+    if isinstance(comment_body, str):
+        return comment_body.replace("\n", "-")
+
+    if isinstance(comment_body, dict):
+        # Jira v3 uses document format for rich text
+        if 'content' in comment_body:
+            text_parts = []
+            collect_document_text(comment_body, text_parts)
+            return ' '.join(text_parts).replace("\n", "-")
+        # Fallback to string representation
+        return str(comment_body).replace("\n", "-")
+
+    return str(comment_body).replace("\n", "-")
+
+
+def collect_document_text(node, text_parts):
+    #text of every node of a document, in order: lists, tables, code blocks and panels included, mentions and
+    #emojis by their display text, line breaks kept as separators
+    for child in node.get('content', []):
+        if 'text' in child:
+            text_parts.append(child['text'])
+        elif child.get('type') == 'hardBreak':
+            text_parts.append("\n")
+        elif (child.get('attrs') or {}).get('text'):
+            text_parts.append(child['attrs']['text'])
+        else:
+            collect_document_text(child, text_parts)
+
+
+def normalize_issue(issue):
+    """
+    Returns the compact record of a raw Jira issue that is written to the epic dumps.
+    Keeps the raw nested shape so from_json reads both, but only with the fields the models use:
+    status changes without the other changelog items, comment bodies as plain text, no avatars or URLs.
+    """
+    fields = issue.get('fields', {})
+    compact_fields = {
+        'summary': fields.get('summary'),
+        'created': fields.get('created'),
+        'issuetype': {'name': (fields.get('issuetype') or {}).get('name')},
+        'assignee': {'displayName': fields['assignee'].get('displayName')} if fields.get('assignee') else None,
+        'customfield_10245': fields.get('customfield_10245'),
+        'customfield_10230': {'value': fields['customfield_10230'].get('value')} if isinstance(fields.get('customfield_10230'), dict) else None,
+        'customfield_10229': fields.get('customfield_10229'),
+        'customfield_10153': fields.get('customfield_10153'),
+        'comment': {'comments': [
+            normalize_comment(comment) for comment in (fields.get('comment') or {}).get('comments', [])
+        ]},
+        'issuelinks': [
+            {'outwardIssue': {'key': link['outwardIssue']['key']}} if 'outwardIssue' in link
+            else {'inwardIssue': {'key': link['inwardIssue']['key']}}
+            for link in fields.get('issuelinks') or [] if 'outwardIssue' in link or 'inwardIssue' in link
+        ]
+    }
+
+    histories = []
+    for history in (issue.get('changelog') or {}).get('histories', []):
+        status_items = [
+            {'field': 'status', 'fromString': item.get('fromString'), 'toString': item.get('toString')}
+            for item in history.get('items', []) if item.get('field') == "status"
+        ]
+        if status_items:
+            histories.append({
+                'id': history.get('id'),
+                'author': {'displayName': history['author']['displayName']},
+                'created': history['created'],
+                'items': status_items
+            })
+
+    return {'key': issue['key'], 'fields': compact_fields, 'changelog': {'histories': histories}}
+
+
+def normalize_comment(comment):
+    #compact record of a raw comment, the id is kept so webhook events can update or delete it
+    return {
+        'id': comment.get('id'),
+        'author': {'displayName': comment['author']['displayName']},
+        'created': comment['created'],
+        'body': extract_comment_text(comment['body'])
+    }
+
+
+def format_duration(duration):
+    total_minutes = int(duration.total_seconds() // 60)
+    hours, minutes = divmod(total_minutes, 60)
+    return f"{hours:01}h {minutes:02}m"
+
 
 @dataclass
 class IssueComment:
     author: str
     timestamp: datetime
     body: str
+    text: str = ""  # plain text of the body, extracted once at load time
 
     def to_dict(self):
         return{
@@ -20,7 +112,8 @@ class IssueComment:
         return cls(
             author=comment['author']['displayName'],
             timestamp=datetime.strptime(comment['created'], "%Y-%m-%dT%H:%M:%S.%f%z"),
-            body=comment['body']
+            body=comment['body'],
+            text=extract_comment_text(comment['body'])
         )
     
 
@@ -61,6 +154,27 @@ class JiraIssue:
     repair_summary: Optional[str] = None
     comments: List['IssueComment'] = field(default_factory=list)
     status_history: List['StatusChange'] = field(default_factory=list)
+    # time spent in each status of status_history, "Current Status" for the last one
+    status_lengths: List[str] = field(default_factory=list, init=False, repr=False, compare=False)
+    # summary built by JiraClient.create_issue_summary, dropped whenever the issue is reloaded
+    summary_cache: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.status_lengths = [
+            format_duration(self.status_history[i + 1].timestamp - change.timestamp)
+            for i, change in enumerate(self.status_history[:-1])
+        ]
+        if self.status_history:
+            self.status_lengths.append("Current Status")
+
+    def invalidate_summary(self):
+        self.summary_cache = None
+
+    def __getstate__(self):
+        # the summary cache is rebuilt on demand, keep it out of pickled snapshots
+        state = self.__dict__.copy()
+        state['summary_cache'] = None
+        return state
 
     def to_dict(self):
         return{
@@ -101,11 +215,15 @@ class JiraIssue:
 class Task(JiraIssue):
     type: str = "Task"
     board_model: Optional[str] = None
+    frequency: Optional[str] = None
+    hashrate: Optional[str] = None
 
     def to_dict(self):
         data = super().to_dict()
         data['type'] = self.type
         data['board_model'] = self.board_model
+        data['frequency'] = self.frequency
+        data['hashrate'] = self.hashrate
         return data
 
     @classmethod
@@ -113,6 +231,8 @@ class Task(JiraIssue):
         data = cls.common_fields(issue)
         cf = issue['fields'].get('customfield_10230')
         data['board_model'] = cf.get('value') if isinstance(cf, dict) else None
+        data['frequency'] = issue['fields'].get('customfield_10229')
+        data['hashrate'] = issue['fields'].get('customfield_10153')
         return cls(**data)
 
 
@@ -142,13 +262,17 @@ class Story(JiraIssue):
         return cls(**data)
     
 
-@dataclass
+@dataclass(frozen=True)
 class Epic:
+    """
+    Immutable snapshot of an epic and its issues. A refresh builds a new Epic with from_json
+    and publishes it by swapping the reference, so readers never see a half-loaded epic.
+    """
     key: str
     title: str
     start_date: datetime
-    tasks: List[Task] = field(default_factory=list)
-    stories: List[Story] = field(default_factory=list)
+    tasks: Tuple[Task, ...] = ()
+    stories: Tuple[Story, ...] = ()
 
     def to_dict(self):
         return{
@@ -159,12 +283,36 @@ class Epic:
             'stories': [s.to_dict() for s in self.stories]
         }
 
-    def load_json(self, json_data):
-        self.tasks.clear()
-        self.stories.clear()
+    @classmethod
+    def from_json(cls, key, title, start_date, json_data):
+        tasks = []
+        stories = []
         for issue in json_data:
             issue_type = issue['fields']['issuetype']['name']
             if issue_type == 'Task':
-                self.tasks.append(Task.from_json(issue))
+                tasks.append(Task.from_json(issue))
+            elif issue_type == 'Story':
+                stories.append(Story.from_json(issue))
+        return cls(key=key, title=title, start_date=start_date, tasks=tuple(tasks), stories=tuple(stories))
+
+    def replace_issue(self, issue_key, issue_json=None):
+        """
+        Returns a copy of the epic with one issue rebuilt from issue_json, or without it if issue_json is None.
+        Every other issue is shared with this epic, a rebuilt issue keeps its position and a new one is added last.
+        """
+        new_issue = None
+        if issue_json is not None:
+            issue_type = issue_json['fields']['issuetype']['name']
+            if issue_type == 'Task':
+                new_issue = Task.from_json(issue_json)
             elif issue_type == 'Story':
-                self.stories.append(Story.from_json(issue))
\ No newline at end of file
+                new_issue = Story.from_json(issue_json)
+
+        def rebuilt(issues, issue_class):
+            keep = new_issue if isinstance(new_issue, issue_class) else None
+            result = [keep if issue.key == issue_key else issue for issue in issues]
+            if keep is not None and all(issue.key != issue_key for issue in issues):
+                result.append(keep)
+            return tuple(issue for issue in result if issue is not None)
+
+        return replace(self, tasks=rebuilt(self.tasks, Task), stories=rebuilt(self.stories, Story))
@@ -0,0 +1,419 @@
+from flask import Flask, request, jsonify
+import argparse, base64, json, os, random, re, threading, time
+from datetime import datetime, timezone
+
+from helper import logger
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Local Jira stub server
+#-----------------------------------------------------------------------------------------------------------
+# stands in for Jira Cloud so refreshes, pagination, 429 handling and board writes can be run offline:
+#
+#   python jiraStub.py --data-dir jira_dumps --latency-ms 150 --rate-limit 5 --error-rate 0.05
+#   SERVER=http://localhost:8089 python app.py
+#
+# implements the endpoints JiraWrapper uses: v3 search/jql with nextPageToken, create, bulk create and edit,
+# plus serverInfo and issue lookup for the jira library. GET /stub/stats returns what was served.
+
+JIRA_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000%z"
+
+
+class JqlError(ValueError):
+    pass
+
+
+#-----------------------------------------------------------------------------------------------------------
+# JQL
+#-----------------------------------------------------------------------------------------------------------
+# only the JQL this repo sends: field = value and summary ~ "text" clauses joined by AND, OR and parentheses
+
+JQL_TOKEN = re.compile(r'\s*(?:(\()|(\))|("(?:[^"\\]|\\.)*")|(~|=)|([^\s()"~=]+))')
+
+
+def tokenize_jql(jql):
+    tokens = []
+    position = 0
+    jql = jql.strip()
+    while position < len(jql):
+        match = JQL_TOKEN.match(jql, position)
+        if not match or match.end() == position:
+            raise JqlError(f"Cannot parse JQL at '{jql[position:]}'")
+        position = match.end()
+        tokens.append(next(group for group in match.groups() if group is not None))
+    return tokens
+
+
+def unquote(token):
+    return token[1:-1].replace('\\"', '"') if token.startswith('"') else token
+
+
+def parse_jql(jql):
+    #returns a predicate that takes (issue, epic key) and tells if the issue matches
+    tokens = tokenize_jql(jql)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        token = peek()
+        if token is None:
+            raise JqlError("Unexpected end of JQL")
+        position += 1
+        return token
+
+    def parse_or():
+        predicates = [parse_and()]
+        while peek() is not None and peek().upper() == "OR":
+            take()
+            predicates.append(parse_and())
+        return predicates[0] if len(predicates) == 1 else lambda issue, epic: any(p(issue, epic) for p in predicates)
+
+    def parse_and():
+        predicates = [parse_term()]
+        while peek() is not None and peek().upper() == "AND":
+            take()
+            predicates.append(parse_term())
+        return predicates[0] if len(predicates) == 1 else lambda issue, epic: all(p(issue, epic) for p in predicates)
+
+    def parse_term():
+        if peek() == "(":
+            take()
+            predicate = parse_or()
+            if take() != ")":
+                raise JqlError("Expected ')'")
+            return predicate
+        return parse_clause(unquote(take()).lower(), take(), unquote(take()))
+
+    predicate = parse_or()
+    if position != len(tokens):
+        raise JqlError(f"Unexpected '{tokens[position]}' in JQL")
+    return predicate
+
+
+def parse_clause(field_name, operator, value):
+    if operator == "~" and field_name == "summary":
+        text = value.lower()
+        return lambda issue, epic: text in (issue["fields"].get("summary") or "").lower()
+    if operator != "=":
+        raise JqlError(f"Unsupported operator '{operator}' for field '{field_name}'")
+
+    if field_name == "issuetype":
+        return lambda issue, epic: issue["fields"].get("issuetype", {}).get("name", "").lower() == value.lower()
+    if field_name == "project":
+        return lambda issue, epic: issue["key"].split("-")[0] == value
+    if field_name in ("epic link", "parent", "cf[10014]"):
+        return lambda issue, epic: epic == value
+    if field_name == "key":
+        return lambda issue, epic: issue["key"] == value
+    raise JqlError(f"Field '{field_name}' is not supported by the stub")
+
+
+#-----------------------------------------------------------------------------------------------------------
+# JiraStub Class
+#-----------------------------------------------------------------------------------------------------------
+
+class JiraStub:
+    """
+    In-memory issue store behind the stub endpoints, loaded from jira_dumps files or generated data.
+    Latency, a requests-per-second rate limit, random 429 injection and the largest page size are configurable.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit=None, error_rate=0.0, retry_after=1, page_size=100, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit # requests per second, None for no limit
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.page_size = page_size
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.issues = {} # issue key -> raw issue, epics included
+        self.issue_epics = {} # issue key -> epic key
+        self.next_issue_number = 1
+        self.request_times = []
+        self.stats = {"requests": 0, "rate_limited": 0, "injected_429": 0, "by_endpoint": {}}
+
+
+    def add_epic(self, epic_data, issues):
+        with self.lock:
+            self.issues[epic_data["key"]] = epic_data
+            for issue in issues:
+                self.issues[issue["key"]] = issue
+                self.issue_epics[issue["key"]] = epic_data["key"]
+            keys = [epic_data["key"]] + [issue["key"] for issue in issues]
+            self.next_issue_number = max(
+                [self.next_issue_number] + [int(key.split("-")[-1]) + 1 for key in keys if key.split("-")[-1].isdigit()]
+            )
+
+
+    def load_dumps(self, data_directory):
+        #loads the epic list and every epic dump written by JiraWrapper
+        with open(os.path.join(data_directory, "epic_metadata.json"), "r", encoding="utf-8") as f:
+            epic_metadata = json.load(f)
+
+        for epic_data in epic_metadata:
+            issues = []
+            issue_file = os.path.join(data_directory, f"{epic_data['key']}.json")
+            if os.path.exists(issue_file):
+                with open(issue_file, "r", encoding="utf-8") as f:
+                    issues = json.load(f)
+            self.add_epic({**epic_data, "fields": {**epic_data.get("fields", {}), "issuetype": {"name": "Epic"}}}, issues)
+
+        logger.info(f"Jira stub loaded {len(epic_metadata)} epics and {len(self.issues)} issues from {data_directory}")
+
+
+    def generate(self, epics, boards, chassis, status_changes, comments, seed):
+        from benchmark import generate_dataset
+
+        epic_metadata, raw_issues = generate_dataset(epics, boards, chassis, status_changes, comments, seed)
+        for epic_data in epic_metadata:
+            epic_data["fields"]["issuetype"] = {"name": "Epic"}
+            self.add_epic(epic_data, raw_issues[epic_data["key"]])
+
+        logger.info(f"Jira stub generated {epics} epics and {len(self.issues)} issues")
+
+
+    def admit(self, endpoint):
+        #simulates latency and rate limiting, returns a 429 response or None if the request may go through
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+        now = time.time()
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["by_endpoint"][endpoint] = self.stats["by_endpoint"].get(endpoint, 0) + 1
+
+            if self.rate_limit:
+                self.request_times = [t for t in self.request_times if now - t < 1.0]
+                if len(self.request_times) >= self.rate_limit:
+                    self.stats["rate_limited"] += 1
+                    return self.too_many_requests()
+                self.request_times.append(now)
+
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.stats["injected_429"] += 1
+                return self.too_many_requests()
+        return None
+
+
+    def too_many_requests(self):
+        response = jsonify({"errorMessages": ["Rate limit exceeded."]})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(self.retry_after)
+        return response
+
+
+    def search(self, jql, max_results, next_page_token, fields, expand):
+        predicate = parse_jql(jql)
+        offset = decode_page_token(next_page_token)
+        page_size = max(1, min(max_results, self.page_size))
+
+        with self.lock:
+            matches = [issue for key, issue in self.issues.items() if predicate(issue, self.issue_epics.get(key))]
+
+        page = matches[offset:offset + page_size]
+        result = {
+            "issues": [shape_issue(issue, fields, "changelog" in expand) for issue in page],
+            "isLast": offset + page_size >= len(matches)
+        }
+        if not result["isLast"]:
+            result["nextPageToken"] = encode_page_token(offset + page_size)
+        return result
+
+
+    def create_issue(self, fields):
+        #returns (created issue, error message)
+        if not fields.get("summary") or not fields.get("issuetype", {}).get("name"):
+            return None, "summary and issuetype are required"
+
+        project = fields.get("project", {}).get("key", "RT")
+        epic_key = fields.get("customfield_10014")
+        with self.lock:
+            key = f"{project}-{self.next_issue_number}"
+            self.next_issue_number += 1
+            issue = {
+                "id": str(self.next_issue_number),
+                "key": key,
+                "fields": {
+                    **fields,
+                    "created": datetime.now(timezone.utc).strftime(JIRA_TIME_FORMAT),
+                    "status": {"name": "Backlog"},
+                    "assignee": None,
+                    "comment": {"comments": [], "total": 0},
+                    "issuelinks": []
+                },
+                "changelog": {"histories": []}
+            }
+            self.issues[key] = issue
+            if epic_key:
+                self.issue_epics[key] = epic_key
+        return issue, None
+
+
+    def edit_issue(self, key, fields):
+        with self.lock:
+            issue = self.issues.get(key)
+            if issue is None:
+                return False
+            issue["fields"].update(fields)
+            if "customfield_10014" in fields:
+                self.issue_epics[key] = fields["customfield_10014"]
+        return True
+
+
+def encode_page_token(offset):
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+
+def decode_page_token(token):
+    if not token:
+        return 0
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(token.encode()))["offset"])
+    except (ValueError, KeyError, TypeError):
+        raise JqlError("Invalid nextPageToken")
+
+
+def shape_issue(issue, fields, with_changelog):
+    #returns the issue with only the requested fields, like Jira does
+    shaped = {"id": issue.get("id", issue["key"]), "key": issue["key"]}
+    if fields:
+        shaped["fields"] = {name: value for name, value in issue["fields"].items() if name in fields}
+    else:
+        shaped["fields"] = dict(issue["fields"])
+    if with_changelog:
+        histories = issue.get("changelog", {}).get("histories", [])
+        shaped["changelog"] = {"startAt": 0, "maxResults": len(histories), "total": len(histories), "histories": histories}
+    return shaped
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Routes
+#-----------------------------------------------------------------------------------------------------------
+
+def create_app(stub):
+    app = Flask(__name__)
+
+    def issue_reference(issue):
+        return {"id": issue["id"], "key": issue["key"], "self": f"{request.host_url}rest/api/3/issue/{issue['id']}"}
+
+    @app.route('/rest/api/<version>/serverInfo', methods=['GET'])
+    def server_info(version):
+        return jsonify({
+            "baseUrl": request.host_url.rstrip("/"), "version": "1001.0.0-SNAPSHOT", "versionNumbers": [1001, 0, 0],
+            "deploymentType": "Cloud", "buildNumber": 100000, "serverTitle": "Jira stub"
+        })
+
+    @app.route('/rest/api/3/search/jql', methods=['GET', 'POST'])
+    def search_jql():
+        rejected = stub.admit("search")
+        if rejected is not None:
+            return rejected
+
+        params = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+        fields = params.get("fields") or []
+        if isinstance(fields, str):
+            fields = [name.strip() for name in fields.split(",") if name.strip()]
+        expand = params.get("expand") or ""
+
+        try:
+            return jsonify(stub.search(
+                params.get("jql", ""), int(params.get("maxResults", 50)), params.get("nextPageToken"), fields, expand
+            ))
+        except (JqlError, ValueError) as e:
+            return jsonify({"errorMessages": [str(e)], "errors": {}}), 400
+
+    @app.route('/rest/api/<version>/issue', methods=['POST'])
+    def create_issue(version):
+        rejected = stub.admit("create")
+        if rejected is not None:
+            return rejected
+
+        issue, error = stub.create_issue((request.get_json(silent=True) or {}).get("fields", {}))
+        if error:
+            return jsonify({"errorMessages": [], "errors": {"fields": error}}), 400
+        return jsonify(issue_reference(issue)), 201
+
+    @app.route('/rest/api/<version>/issue/bulk', methods=['POST'])
+    def create_issues_bulk(version):
+        rejected = stub.admit("bulk_create")
+        if rejected is not None:
+            return rejected
+
+        created = []
+        errors = []
+        for index, update in enumerate((request.get_json(silent=True) or {}).get("issueUpdates", [])):
+            issue, error = stub.create_issue(update.get("fields", {}))
+            if error:
+                errors.append({"status": 400, "failedElementNumber": index,
+                               "elementErrors": {"errorMessages": [], "errors": {"fields": error}}})
+            else:
+                created.append(issue_reference(issue))
+
+        return jsonify({"issues": created, "errors": errors}), 400 if errors and not created else 201
+
+    @app.route('/rest/api/<version>/issue/<issue_key>', methods=['GET'])
+    def get_issue(version, issue_key):
+        rejected = stub.admit("get")
+        if rejected is not None:
+            return rejected
+
+        issue = stub.issues.get(issue_key)
+        if issue is None:
+            return jsonify({"errorMessages": ["Issue does not exist or you do not have permission to see it."]}), 404
+        return jsonify(shape_issue(issue, None, "changelog" in request.args.get("expand", "")))
+
+    @app.route('/rest/api/<version>/issue/<issue_key>', methods=['PUT'])
+    def edit_issue(version, issue_key):
+        rejected = stub.admit("edit")
+        if rejected is not None:
+            return rejected
+
+        if not stub.edit_issue(issue_key, (request.get_json(silent=True) or {}).get("fields", {})):
+            return jsonify({"errorMessages": ["Issue does not exist or you do not have permission to see it."]}), 404
+        return "", 204
+
+    @app.route('/stub/stats', methods=['GET'])
+    def stats():
+        with stub.lock:
+            return jsonify({**stub.stats, "issues": len(stub.issues)})
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Jira endpoints used by JiraWrapper.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--data-dir", help="serve the epics of a jira_dumps directory")
+    parser.add_argument("--epics", type=int, default=5, help="epics to generate when no --data-dir is given")
+    parser.add_argument("--boards", type=int, default=400, help="hashboard tasks per generated epic")
+    parser.add_argument("--chassis", type=int, default=40, help="chassis stories per generated epic")
+    parser.add_argument("--status-changes", type=int, default=8, help="maximum status changes per generated board")
+    parser.add_argument("--comments", type=int, default=4, help="maximum comments per generated issue")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random +/- variation of the latency")
+    parser.add_argument("--rate-limit", type=float, help="requests per second before answering 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an injected 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--page-size", type=int, default=100, help="largest search page served")
+    args = parser.parse_args(argv)
+
+    stub = JiraStub(
+        latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, rate_limit=args.rate_limit,
+        error_rate=args.error_rate, retry_after=args.retry_after, page_size=args.page_size, seed=args.seed
+    )
+    if args.data_dir:
+        stub.load_dumps(args.data_dir)
+    else:
+        stub.generate(args.epics, args.boards, args.chassis, args.status_changes, args.comments, args.seed)
+
+    create_app(stub).run(host="0.0.0.0", port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
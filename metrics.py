@@ -0,0 +1,136 @@
+import bisect, threading
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Prometheus text format metrics
+#-----------------------------------------------------------------------------------------------------------
+# small in-process registry, recording a value is a dict lookup and an add under a lock
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.lock = threading.Lock()
+        self.values = {}
+        REGISTRY.append(self)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self.lock:
+            lines.extend(self.render_samples())
+        return lines
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render_samples(self):
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in self.values.items()]
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labels=(), callback=None):
+        super().__init__(name, documentation, labels)
+        self.callback = callback # read at scrape time instead of being set
+
+    def set(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self.lock:
+            self.values[key] = value
+
+    def render_samples(self):
+        if self.callback is not None:
+            return [f"{self.name} {_format_value(self.callback())}"]
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in self.values.items()]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                # one slot per bucket plus +Inf, then the running sum
+                counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def render_samples(self):
+        lines = []
+        for key, counts in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', _format_value(float(bound))))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+REGISTRY = []
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Metrics
+#-----------------------------------------------------------------------------------------------------------
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Time spent serving a request, until the last byte of a streamed response.",
+    labels=("route", "method", "status"))
+http_response_size = Histogram(
+    "http_response_size_bytes", "Size of the response body.", labels=("route",), buckets=SIZE_BUCKETS)
+
+jira_requests = Counter("jira_requests_total", "Requests sent to Jira by response status.", labels=("endpoint", "status"))
+jira_request_duration = Histogram("jira_request_duration_seconds", "Latency of requests sent to Jira.", labels=("endpoint",))
+jira_rate_limited = Counter("jira_rate_limited_total", "429 Too Many Requests answers from Jira.", labels=("endpoint",))
+jira_retries = Counter("jira_retries_total", "Requests to Jira that were retried after a 429 or a network error.", labels=("endpoint",))
+rate_limiter_wait = Histogram("jira_rate_limiter_wait_seconds", "Time spent waiting on the shared Jira rate limiter.")
+
+epic_load_duration = Histogram("epic_load_duration_seconds", "Time spent loading an epic from its dump file.")
+epic_refresh_duration = Histogram("epic_refresh_duration_seconds", "Time spent refreshing an epic from Jira.", labels=("result",))
+issue_summary_cache = Counter("issue_summary_cache_total", "Issue summary cache lookups.", labels=("result",))
+jira_webhook_events = Counter("jira_webhook_events_total", "Jira webhook events received by result.", labels=("event", "result"))
@@ -0,0 +1,56 @@
+import cProfile, os, random, re, time
+
+from helper import logger
+
+
+#-----------------------------------------------------------------------------------------------------------
+# RequestProfiler Class
+#-----------------------------------------------------------------------------------------------------------
+
+class RequestProfiler:
+    """
+    Opt-in cProfile of single requests. A request is profiled when it carries the X-Profile header or the
+    profile query parameter set to the admin token, and then only for a PROFILE_SAMPLE_RATE share of those.
+    Profiles are written as .prof files (readable with pstats or snakeviz) named after the route and epic key.
+    Without a token configured, should_profile is a single attribute check.
+    cProfile only sees the thread that enabled it: work a request hands to other threads, like the Jira calls of
+    update_jira_with_board_data_batch or the board write queue worker, shows up as waiting time, not as calls.
+    """
+
+    def __init__(self, token=None, sample_rate=1.0, directory="profiles"):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.directory = directory
+
+    def should_profile(self, request):
+        if not self.token:
+            return False
+        if self.token not in (request.headers.get('X-Profile'), request.args.get('profile')):
+            return False
+        return random.random() < self.sample_rate
+
+    def start(self):
+        #returns None if another request is already being profiled, newer Pythons allow one active profiler
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            logger.warning(f"Skipping request profile: {e}")
+            return None
+        return profile
+
+    def finish(self, profile, route, epic_key=None):
+        profile.disable()
+
+        os.makedirs(self.directory, exist_ok=True)
+        name_parts = [time.strftime("%Y%m%d-%H%M%S"), route.strip("/").replace("/", "_") or "index"]
+        if epic_key:
+            name_parts.append(str(epic_key))
+        file_name = re.sub(r"[^A-Za-z0-9_.-]", "_", "_".join(name_parts)) + f"_{os.getpid()}_{id(profile):x}.prof"
+        file_path = os.path.join(self.directory, file_name)
+
+        try:
+            profile.dump_stats(file_path)
+            logger.info(f"Wrote request profile {file_path}")
+        except OSError as e:
+            logger.error(f"Failed to write request profile {file_path}: {e}")
@@ -0,0 +1,130 @@
+import math, re, threading
+
+
+#-----------------------------------------------------------------------------------------------------------
+# TextSearchIndex Class
+#-----------------------------------------------------------------------------------------------------------
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+SNIPPET_RADIUS = 60 # characters kept on each side of the first matching word
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class TextSearchIndex:
+    """
+    Inverted index over the repair notes of the loaded issues: the plain text of every comment and the repair summary.
+    Queries match issues containing every query word and are ranked with BM25. Issues are added and removed one at
+    a time, so a refresh only touches the issues it changed.
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.documents = {} # issue key -> {"epic_key", "serial", "texts": [(source, text)], "length"}
+        self.postings = {} # word -> {issue key -> occurrences}
+        self.total_length = 0
+
+
+    def add(self, epic_key, issue):
+        texts = [("comment", comment.text) for comment in issue.comments if comment.text]
+        if issue.repair_summary:
+            texts.append(("repair_summary", issue.repair_summary))
+
+        counts = {}
+        for _, text in texts:
+            for word in tokenize(text):
+                counts[word] = counts.get(word, 0) + 1
+
+        with self.lock:
+            self._remove(issue.key)
+            if not counts:
+                return
+            self.documents[issue.key] = {
+                "epic_key": epic_key, "serial": issue.serial, "texts": texts, "length": sum(counts.values())
+            }
+            self.total_length += self.documents[issue.key]["length"]
+            for word, count in counts.items():
+                self.postings.setdefault(word, {})[issue.key] = count
+
+
+    def remove(self, epic_key, issue_key):
+        with self.lock:
+            document = self.documents.get(issue_key)
+            # an issue moved to another epic is already indexed under that one
+            if document is not None and document["epic_key"] == epic_key:
+                self._remove(issue_key)
+
+
+    def _remove(self, issue_key):
+        #call while holding the lock
+        document = self.documents.pop(issue_key, None)
+        if document is None:
+            return
+        self.total_length -= document["length"]
+        for _, text in document["texts"]:
+            for word in set(tokenize(text)):
+                issues = self.postings.get(word)
+                if issues is not None:
+                    issues.pop(issue_key, None)
+                    if not issues:
+                        del self.postings[word]
+
+
+    def search(self, query, epic_key=None, limit=20):
+        #returns (number of matching issues, the best limit results with their score and a snippet)
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return 0, []
+
+        with self.lock:
+            word_postings = [self.postings.get(word, {}) for word in words]
+            if not all(word_postings):
+                return 0, []
+
+            # every word must match, intersect from the rarest word
+            word_postings.sort(key=len)
+            matches = set(word_postings[0]).intersection(*word_postings[1:])
+            if epic_key is not None:
+                matches = {issue_key for issue_key in matches if self.documents[issue_key]["epic_key"] == epic_key}
+
+            document_count = len(self.documents)
+            average_length = self.total_length / document_count
+            scores = {}
+            for postings in word_postings:
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for issue_key in matches:
+                    occurrences = postings[issue_key]
+                    length_norm = 1 - self.B + self.B * self.documents[issue_key]["length"] / average_length
+                    scores[issue_key] = scores.get(issue_key, 0.0) + idf * occurrences * (self.K1 + 1) / (occurrences + self.K1 * length_norm)
+
+            ranked = sorted(matches, key=lambda issue_key: (-scores[issue_key], issue_key))[:limit]
+            results = []
+            for issue_key in ranked:
+                document = self.documents[issue_key]
+                source, snippet = make_snippet(document["texts"], set(words))
+                results.append({
+                    "epic_key": document["epic_key"],
+                    "issue_key": issue_key,
+                    "serial": document["serial"],
+                    "score": round(scores[issue_key], 3),
+                    "source": source,
+                    "snippet": snippet
+                })
+
+        return len(matches), results
+
+
+def make_snippet(texts, words):
+    #returns (source, text around the first query word) from the first text that has one
+    for source, text in texts:
+        for match in TOKEN_PATTERN.finditer(text.lower()):
+            if match.group() in words:
+                start = max(0, match.start() - SNIPPET_RADIUS)
+                end = min(len(text), match.end() + SNIPPET_RADIUS)
+                snippet = text[start:end].replace("\n", " ").strip()
+                return source, ("..." if start > 0 else "") + snippet + ("..." if end < len(text) else "")
+    return None, ""
@@ -0,0 +1,156 @@
+import fcntl, hashlib, json, mmap, os, pickle, struct
+from contextlib import contextmanager
+
+from helper import logger
+
+
+#-----------------------------------------------------------------------------------------------------------
+# SnapshotStore Class
+#-----------------------------------------------------------------------------------------------------------
+
+class SnapshotStore:
+    """
+    Shared, read-only snapshot of the parsed epics for running several server workers on one machine.
+
+    The epics live in one memory-mapped snapshot file per generation: a JSON header with the offset, length and
+    digest of every epic, followed by one pickled Epic per key. The current generation number is kept in a small
+    memory-mapped counter file, so a worker can check for a new snapshot on every request without a system call.
+    Workers only unpickle the epics whose digest changed since the generation they last read, and only the worker
+    holding the refresh lock publishes a new generation.
+
+    What is shared is the snapshot file, through the page cache, not the decoded epics: every process holds its
+    own Python objects. Workers forked by gunicorn --preload after the first load start on the master's generation
+    and share its objects copy-on-write (app.py freezes them out of the garbage collector), so a worker only pays
+    for the epics that changed after it started.
+    """
+    HEADER_SIZE = struct.Struct("<Q")
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock_path = os.path.join(self.directory, "snapshot.lock")
+        self.generation_path = os.path.join(self.directory, "snapshot.gen")
+
+        # the counter file is created once, every worker then maps the same 8 bytes
+        with self.refresh_lock():
+            if not os.path.exists(self.generation_path) or os.path.getsize(self.generation_path) != self.HEADER_SIZE.size:
+                with open(self.generation_path, "wb") as f:
+                    f.write(self.HEADER_SIZE.pack(0))
+
+        self.generation_file = open(self.generation_path, "r+b")
+        self.generation_map = mmap.mmap(self.generation_file.fileno(), self.HEADER_SIZE.size)
+
+
+    def snapshot_path(self, generation):
+        return os.path.join(self.directory, f"snapshot-{generation}.bin")
+
+
+    def current_generation(self):
+        return self.HEADER_SIZE.unpack_from(self.generation_map, 0)[0]
+
+
+    @contextmanager
+    def refresh_lock(self):
+        #exclusive across every worker process, so only one of them refreshes and publishes at a time
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+    @contextmanager
+    def open_snapshot(self, generation):
+        #yields (header, mapped snapshot) for a generation, or (None, None) if it has not been published
+        try:
+            f = open(self.snapshot_path(generation), "rb")
+        except FileNotFoundError:
+            yield None, None
+            return
+
+        with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as snapshot:
+            header_length = self.HEADER_SIZE.unpack_from(snapshot, 0)[0]
+            data_start = self.HEADER_SIZE.size + header_length
+            header = json.loads(snapshot[self.HEADER_SIZE.size:data_start])
+            for entry in header["epics"].values():
+                entry[0] += data_start
+            yield header, snapshot
+
+
+    def read(self, known_digests):
+        """
+        Reads the current generation, returns (generation, epics, digests).
+        epics only holds the epics that are new or changed compared to known_digests,
+        digests holds every epic of the snapshot so callers can tell which ones were removed.
+        """
+        generation = self.current_generation()
+        if generation == 0:
+            return 0, {}, None
+
+        with self.open_snapshot(generation) as (header, snapshot):
+            if header is None:
+                if self.current_generation() != generation:
+                    # a newer generation replaced it between the two reads, try again with that one
+                    return self.read(known_digests)
+                logger.error(f"Epic snapshot generation {generation} is missing")
+                return generation, {}, None
+
+            epics = {}
+            digests = {}
+            for key, (offset, length, digest) in header["epics"].items():
+                digests[key] = digest
+                if known_digests.get(key) != digest:
+                    epics[key] = pickle.loads(snapshot[offset:offset + length])
+
+        return generation, epics, digests
+
+
+    def publish(self, changed_epics, removed_keys=()):
+        """
+        Publishes a new generation with changed_epics ({key: Epic}) pickled fresh and every other epic copied as-is
+        from the current generation. Must be called while holding refresh_lock.
+        Returns the new generation and the digests of every epic in it.
+        """
+        generation = self.current_generation()
+        blobs = {}
+
+        with self.open_snapshot(generation) as (header, snapshot):
+            if header is not None:
+                for key, (offset, length, digest) in header["epics"].items():
+                    if key not in changed_epics and key not in removed_keys:
+                        blobs[key] = (snapshot[offset:offset + length], digest)
+
+        for key, epic in changed_epics.items():
+            blob = pickle.dumps(epic, protocol=pickle.HIGHEST_PROTOCOL)
+            blobs[key] = (blob, hashlib.sha1(blob).hexdigest())
+
+        # offsets in the header are relative to the end of the header
+        index = {}
+        offset = 0
+        for key, (blob, digest) in blobs.items():
+            index[key] = [offset, len(blob), digest]
+            offset += len(blob)
+        header = json.dumps({"generation": generation + 1, "epics": index}).encode()
+
+        new_path = self.snapshot_path(generation + 1)
+        tmp_path = new_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.HEADER_SIZE.pack(len(header)))
+            f.write(header)
+            for blob, _ in blobs.values():
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, new_path)
+
+        self.HEADER_SIZE.pack_into(self.generation_map, 0, generation + 1)
+        self.generation_map.flush()
+
+        # keep the previous generation around for workers that are still reading it
+        old_path = self.snapshot_path(generation - 1)
+        if os.path.exists(old_path):
+            os.remove(old_path)
+
+        logger.info(f"Published epic snapshot generation {generation + 1} ({len(changed_epics)} changed, {len(blobs)} total)")
+        return generation + 1, {key: digest for key, (_, digest) in blobs.items()}
@@ -3,6 +3,10 @@ let timelineChart = null;
 let currentOrderKey = null;
 let originalTimelineData = null;
 let originalChartData = null;
+let timelineEvents = null;
+let timelineEventsKey = null;
+let liveCounts = null;
+let timelineStale = false;
 
 // Function to parse URL parameters
 function getUrlParameter(name) {
@@ -132,8 +136,9 @@ async function restoreOriginalChart() {
     await renderChart(originalChartData);
     
     // Restore click functionality
-    timelineChart.options.onClick = (event, elements) => {
+    timelineChart.options.onClick = async (event, elements) => {
         if (!elements.length) return;
+        await refreshStaleIssueLists();
     
         const point = elements[0];
         const datasetIndex = point.datasetIndex;
@@ -190,8 +195,9 @@ async function updateChartWithFilter(selectedAssignee) {
     await renderChart(chartData);
     
     // Restore click functionality
-    timelineChart.options.onClick = (event, elements) => {
+    timelineChart.options.onClick = async (event, elements) => {
         if (!elements.length) return;
+        await refreshStaleIssueLists();
     
         const point = elements[0];
         const datasetIndex = point.datasetIndex;
@@ -250,8 +256,14 @@ async function loadTimelineData(rtValue) {
         infoDisplay.innerHTML = ''; //reset the serial list display
         await renderChart(data);
 
-        timelineChart.options.onClick = (event, elements) => {
+        // keep the chart current with the server pushed count changes
+        liveCounts = countsFromTimeline(data_raw.timeline);
+        timelineStale = false;
+        subscribeTimelineEvents(data_raw.rt);
+
+        timelineChart.options.onClick = async (event, elements) => {
             if (!elements.length) return;
+            await refreshStaleIssueLists();
         
             const point = elements[0];
             const datasetIndex = point.datasetIndex;
@@ -277,6 +289,126 @@ async function loadTimelineData(rtValue) {
 }
 
 
+// Live updates: the server pushes the changed per-day counts of the epic over server-sent events
+function subscribeTimelineEvents(epicKey) {
+    if (!window.EventSource || (timelineEvents && timelineEventsKey === epicKey)) return;
+    if (timelineEvents) timelineEvents.close();
+
+    timelineEventsKey = epicKey;
+    timelineEvents = new EventSource(`/api/timeline_events?rt=${encodeURIComponent(epicKey)}`);
+
+    // the snapshot covers changes made between the timeline fetch and the subscription
+    timelineEvents.addEventListener('snapshot', (e) => {
+        const snapshot = JSON.parse(e.data);
+        if (snapshot.timeline) {
+            applyTimelineDelta({
+                days: Object.keys(snapshot.timeline),
+                statuses: Object.keys(Object.values(snapshot.timeline)[0] || {}),
+                counts: snapshot.timeline,
+                issues: []
+            });
+        }
+    });
+
+    timelineEvents.addEventListener('delta', (e) => applyTimelineDelta(JSON.parse(e.data)));
+
+    // the stream fell behind, reload everything once and subscribe again
+    timelineEvents.addEventListener('reset', () => {
+        timelineEvents.close();
+        timelineEvents = null;
+        timelineEventsKey = null;
+        if (currentOrderKey) loadTimelineData(currentOrderKey);
+    });
+}
+
+function countsFromTimeline(timeline) {
+    const counts = {};
+    for (const day in (timeline || {})) {
+        counts[day] = {};
+        for (const status in timeline[day]) {
+            counts[day][status] = timeline[day][status]?.length ?? 0;
+        }
+    }
+    return counts;
+}
+
+async function applyTimelineDelta(delta) {
+    if (!liveCounts || !timelineChart) return;
+
+    let changed = false;
+    if (delta.days) {
+        const days = {};
+        delta.days.forEach(day => days[day] = liveCounts[day] || {});
+        changed = Object.keys(liveCounts).join() !== delta.days.join();
+        liveCounts = days;
+    }
+    for (const day in (delta.counts || {})) {
+        if (!liveCounts[day]) continue;
+        for (const status in delta.counts[day]) {
+            if (liveCounts[day][status] !== delta.counts[day][status]) {
+                liveCounts[day][status] = delta.counts[day][status];
+                changed = true;
+            }
+        }
+    }
+
+    (delta.issues || []).forEach(issue => {
+        log(`${issue.serial}: ${issue.from_status || 'new'} -> ${issue.removed ? 'removed' : issue.to_status}`);
+    });
+
+    if (!changed && !delta.statuses) return;
+    timelineStale = true;
+
+    const labels = Object.keys(liveCounts).sort();
+    const statuses = delta.statuses || originalChartData.datasets.map(ds => ds.label);
+    originalChartData = {
+        ...originalChartData,
+        labels: labels,
+        datasets: statuses.map(status => ({
+            label: status,
+            data: labels.map(day => liveCounts[day][status] ?? null)
+        }))
+    };
+
+    // a filtered chart is rebuilt from originalChartData when the filter is cleared
+    const dropdown = document.getElementById('assignee-dropdown');
+    if (dropdown && dropdown.value) return;
+
+    const datasets = originalChartData.datasets.map(ds => {
+        const existing = timelineChart.data.datasets.find(current => current.label === ds.label);
+        if (existing) {
+            existing.data = ds.data;
+            return existing;
+        }
+        const color = statusColors[ds.label] || getRandomColor();
+        return { label: ds.label, data: ds.data, borderColor: color, backgroundColor: color, fill: false, tension: 0.1 };
+    });
+    if (delta.days) {
+        timelineChart.options.plugins.annotation.annotations = await generateWeekendBoxes(labels);
+    }
+    timelineChart.data.labels = labels;
+    timelineChart.data.datasets = datasets;
+    timelineChart.update('none');
+}
+
+// the serial lists still hold the issues of the last full load, fetch them again only when one is opened
+async function refreshStaleIssueLists() {
+    if (!timelineStale || !currentOrderKey) return;
+
+    try {
+        const response = await fetch(`/api/get_timeline?rt=${currentOrderKey}`);
+        const data_raw = await response.json();
+        originalTimelineData = data_raw;
+        const dropdown = document.getElementById('assignee-dropdown');
+        window.timeline = dropdown && dropdown.value
+            ? filterTimelineByAssignee(data_raw.timeline, dropdown.value)
+            : data_raw.timeline;
+        timelineStale = false;
+    } catch (error) {
+        console.error('Error refreshing timeline issues:', error);
+    }
+}
+
 function formatTimelineForChartjsDelta(epicData) {
     const timeline = epicData.timeline;
 
@@ -697,6 +829,13 @@ function createHbString(hashboard) {
         answer += `Linked Issues:\n${hashboard.linked_issues.join('\n')}\n`;
     }
 
+    if (hashboard.board_history && hashboard.board_history.length > 0) {
+        answer += `Other Orders:\n`;
+        for (const appearance of hashboard.board_history) {
+            answer += `${appearance.created} ${appearance.epic_key} ${appearance.outcome ?? ''} (${appearance.repairs.length} repairs, ${appearance.repair_hours}h)\n`;
+        }
+    }
+
     for (const event of hashboard.events) {
         const init = initials(event.author);
         if (event.type === "status_change") {
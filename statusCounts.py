@@ -0,0 +1,205 @@
+import threading
+from datetime import date, datetime
+
+
+#-----------------------------------------------------------------------------------------------------------
+# EpicStatusCounts Class
+#-----------------------------------------------------------------------------------------------------------
+
+# same rules as JiraClient.build_and_fill_epic_timeline
+PROCESSED_STATUSES = {'Awaiting Functional Test', 'Passed Initial Diagnosis', 'Scrap', 'Done'}
+CONVERTED_STATUSES = {"Advanced Repair": "Awaiting Advanced Repair", "Backlog": "Awaiting Advanced Repair"}
+CHASSIS_STATUSES = {"Ready to Ship"}
+
+
+class EpicStatusCounts:
+    """
+    Materialized day x status count table of one epic, the counts build_and_fill_epic_timeline would give each day.
+    Every issue adds +1/-1 day intervals to a difference array per status, so a refresh only reverses the intervals
+    of the issues it changed and applies their new ones. Reads go through snapshot(), which prefix sums the
+    difference arrays into dense per-day columns once per change.
+    """
+
+    def __init__(self, start_date):
+        self.start_ordinal = (start_date.date() if hasattr(start_date, 'date') else start_date).toordinal()
+        self.lock = threading.Lock()
+        self.epic = None # the Epic object the table currently matches, None while it is being updated
+        self.contributions = {} # issue key -> what the issue added, so it can be reversed exactly
+        self.diffs = {} # status -> {day ordinal: delta}
+        self.done_diff = {} # day ordinal -> delta of tasks that are Done, counting changes from the epic start only
+        self.change_days = {} # day ordinal -> number of task status changes on that day, from the epic start
+        self.task_count = 0
+        self.cached_snapshot = None
+
+
+    def begin_update(self):
+        with self.lock:
+            self.epic = None
+
+
+    def end_update(self, epic):
+        with self.lock:
+            self.epic = epic
+
+
+    def add_issue(self, issue):
+        contribution = self.build_contribution(issue)
+        with self.lock:
+            self.remove_contribution(self.contributions.pop(issue.key, None))
+            self.apply_contribution(contribution, 1)
+            self.contributions[issue.key] = contribution
+            self.cached_snapshot = None
+
+
+    def remove_issue(self, issue_key):
+        with self.lock:
+            self.remove_contribution(self.contributions.pop(issue_key, None))
+            self.cached_snapshot = None
+
+
+    def build_contribution(self, issue):
+        #returns the day intervals of the issue, (status, first day, day after the last or None if still open)
+        is_task = issue.type == "Task"
+
+        # the status of a day is the last change of that day, carried forward to the days without changes
+        day_status = {}
+        for change in issue.status_history:
+            day_status[change.timestamp.date().toordinal()] = change.to_status
+        change_days = sorted(day_status)
+        created = issue.created.date().toordinal()
+
+        # an issue counts from the day it was created, and on any earlier day it changed status
+        points = sorted(set(change_days) | {created})
+        intervals = []
+        status = None
+        for i, day in enumerate(points):
+            status = day_status.get(day, status)
+            if day < created:
+                end = day + 1
+            else:
+                end = points[i + 1] if i + 1 < len(points) else None
+
+            if is_task:
+                intervals.append(('Total Boards', day, end))
+                if status is not None:
+                    if status in PROCESSED_STATUSES:
+                        intervals.append(('Total Processed', day, end))
+                    intervals.append((CONVERTED_STATUSES.get(status, status), day, end))
+            else:
+                intervals.append(('Total Chassis', day, end))
+                if status in CHASSIS_STATUSES:
+                    intervals.append((status, day, end))
+
+        contribution = {"is_task": is_task, "intervals": intervals, "done": [], "change_days": [], "last_change": None}
+        if not is_task:
+            return contribution
+
+        # epic_end_date only looks at the changes made on or after the epic start
+        started_days = [day for day in change_days if day >= self.start_ordinal]
+        for i, day in enumerate(started_days):
+            if day_status[day] == 'Done':
+                contribution["done"].append((day, started_days[i + 1] if i + 1 < len(started_days) else None))
+        contribution["change_days"] = started_days
+        if issue.status_history and issue.status_history[-1].timestamp.date().toordinal() >= self.start_ordinal:
+            contribution["last_change"] = issue.status_history[-1].timestamp
+        return contribution
+
+
+    def apply_contribution(self, contribution, sign):
+        for status, start, end in contribution["intervals"]:
+            add_delta(self.diffs.setdefault(status, {}), start, end, sign)
+
+        if contribution["is_task"]:
+            self.task_count += sign
+            for start, end in contribution["done"]:
+                add_delta(self.done_diff, start, end, sign)
+            for day in contribution["change_days"]:
+                count = self.change_days.get(day, 0) + sign
+                if count:
+                    self.change_days[day] = count
+                else:
+                    self.change_days.pop(day, None)
+
+
+    def remove_contribution(self, contribution):
+        if contribution is not None:
+            self.apply_contribution(contribution, -1)
+
+
+    def snapshot(self, epic):
+        #returns the dense counts for this Epic object, or None if the table does not match it
+        with self.lock:
+            if self.epic is not epic:
+                return None
+            if self.cached_snapshot is None:
+                last_changes = [c["last_change"] for c in self.contributions.values() if c["last_change"] is not None]
+                self.cached_snapshot = StatusCountsSnapshot(
+                    self.diffs, self.done_diff, self.change_days, max(last_changes) if last_changes else None, self.task_count
+                )
+            return self.cached_snapshot
+
+
+def add_delta(diff, start, end, sign):
+    for day, delta in ((start, sign), (end, -sign)):
+        if day is None:
+            continue
+        value = diff.get(day, 0) + delta
+        if value:
+            diff[day] = value
+        else:
+            diff.pop(day, None)
+
+
+def prefix_columns(diff, first, last):
+    #prefix sums a difference array into one count per day from first to last
+    column = []
+    running = 0
+    for day in range(first, last + 1):
+        running += diff.get(day, 0)
+        column.append(running)
+    return column
+
+
+class StatusCountsSnapshot:
+    """Read-only dense counts, one list per status with the count of every day from first_ordinal."""
+
+    def __init__(self, diffs, done_diff, change_days, last_change, task_count):
+        days = set(change_days) | set(done_diff)
+        for diff in diffs.values():
+            days.update(diff)
+
+        self.first_ordinal = min(days) if days else 0
+        self.last_ordinal = max(days) if days else -1
+        self.columns = {
+            status: prefix_columns(diff, self.first_ordinal, self.last_ordinal) for status, diff in diffs.items() if diff
+        }
+        self.task_count = task_count
+        self.end_date = self.find_end_date(done_diff, sorted(change_days), last_change)
+
+
+    def count(self, status, day):
+        column = self.columns.get(status)
+        if not column:
+            return 0
+        index = day.toordinal() - self.first_ordinal
+        if index < 0:
+            return 0
+        return column[min(index, len(column) - 1)] # open intervals keep counting after the last change
+
+
+    def find_end_date(self, done_diff, change_days, last_change):
+        #same as JiraClient.epic_end_date: the first change day every task is Done, else the last change
+        if self.task_count == 0:
+            return None
+
+        done = 0
+        done_days = sorted(done_diff)
+        index = 0
+        for day in change_days:
+            while index < len(done_days) and done_days[index] <= day:
+                done += done_diff[done_days[index]]
+                index += 1
+            if done == self.task_count:
+                return datetime.combine(date.fromordinal(day), datetime.min.time())
+
+        return last_change
@@ -0,0 +1,145 @@
+import json, os
+
+import pytest
+
+from benchmark import build_client, generate_dataset
+
+
+#-----------------------------------------------------------------------------------------------------------
+# Jira webhook events
+#-----------------------------------------------------------------------------------------------------------
+# replays the payloads of webhook_samples/ against a client loaded from synthetic dumps, then checks the
+# in-memory state against a client freshly loaded from the dumps the events rewrote
+
+SAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "webhook_samples")
+SAMPLE_ISSUE = "RT-4821"
+SAMPLE_SERIAL = "YNAHBDCBCAFJI0123"
+
+
+def load_sample(name):
+    with open(os.path.join(SAMPLES_DIRECTORY, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def replay(client, *names):
+    return [client.apply_webhook_event(load_sample(name)) for name in names]
+
+
+def dump_client(metadata):
+    #a second client over the dumps already on disk, as after a restart
+    from JiraClient import JiraClient
+
+    class DumpClient(JiraClient):
+        def get_epics_from_jira(self):
+            return metadata
+
+    return DumpClient()
+
+
+def epics_holding(client, issue_key):
+    return [key for key, epic in client.epics.items() if any(issue.key == issue_key for issue in epic.tasks + epic.stories)]
+
+
+@pytest.fixture
+def metadata(tmp_path, monkeypatch):
+    # the samples use the orders RT-101 and RT-102
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LAZY_STARTUP", "false")
+    monkeypatch.setenv("SHARED_SNAPSHOT", "false")
+    generated, raw_issues = generate_dataset(3, 20, 3, 6, 2, seed=1)
+    metadata = []
+    issues = {}
+    for number, epic_data in enumerate(generated, start=100):
+        key = f"RT-{number}"
+        metadata.append({**epic_data, "key": key})
+        issues[key] = raw_issues[epic_data["key"]]
+    return metadata, issues
+
+
+@pytest.fixture
+def client(metadata, tmp_path):
+    return build_client(*metadata, str(tmp_path))
+
+
+def assert_matches_fresh_load(client, metadata):
+    fresh = dump_client(metadata[0])
+
+    assert client.epics == fresh.epics
+    assert json.dumps(client.get_all_rt_epics(), default=str) == json.dumps(fresh.get_all_rt_epics(), default=str)
+    assert json.dumps(list(client.get_all_order_summaries()), default=str) == \
+        json.dumps(list(fresh.get_all_order_summaries()), default=str)
+    assert client.serial_index == fresh.serial_index
+
+    for key, epic in client.epics.items():
+        counts, fresh_counts = client.status_counts[key], fresh.status_counts[key]
+        assert counts.contributions == fresh_counts.contributions
+        assert counts.diffs == fresh_counts.diffs
+        assert counts.task_count == fresh_counts.task_count
+        assert client.build_epic_count_timeline(epic) == fresh.build_epic_count_timeline(fresh.epics[key])
+
+
+def test_created_issue_without_changelog(client, metadata):
+    assert replay(client, "jira_issue_created") == ["applied"]
+    assert epics_holding(client, SAMPLE_ISSUE) == ["RT-101"]
+
+    # a task without any status change is an open board, not a crash
+    orders = {order["rt_num"]: order for order in client.get_all_rt_epics()}
+    assert orders["RT-101"]["is_closed"] is False
+    assert len(list(client.get_all_order_summaries())) == len(metadata[0])
+
+    summaries = list(client.get_issue_summary_from_epic("RT-101"))
+    assert summaries[-1]["serial"] == SAMPLE_SERIAL and summaries[-1]["time"] is None
+    list(client.get_repair_data_from_epic("RT-101"))
+
+    assert_matches_fresh_load(client, metadata)
+
+
+def test_status_update_and_comments(client, metadata):
+    assert replay(client, "jira_issue_created", "jira_issue_updated_status", "comment_created", "comment_updated") == ["applied"] * 4
+
+    issue = next(task for task in client.epics["RT-101"].tasks if task.key == SAMPLE_ISSUE)
+    assert [change.to_status for change in issue.status_history] == ["Passed Initial Diagnosis"]
+    assert [comment.text for comment in issue.comments] == ["Chain 2 missing 4 chips, reflowed U31 to U34"]
+    assert client.serial_index[SAMPLE_SERIAL][SAMPLE_ISSUE]["current_status"] == "Passed Initial Diagnosis"
+    assert_matches_fresh_load(client, metadata)
+
+    # the same status change delivered twice is applied once
+    assert replay(client, "jira_issue_updated_status", "comment_deleted") == ["applied"] * 2
+    issue = next(task for task in client.epics["RT-101"].tasks if task.key == SAMPLE_ISSUE)
+    assert len(issue.status_history) == 1 and issue.comments == []
+    assert_matches_fresh_load(client, metadata)
+
+
+def test_epic_relink_moves_issue(client, metadata):
+    assert replay(client, "jira_issue_created", "jira_issue_updated_status", "jira_issue_updated_epic_link") == ["applied"] * 3
+
+    assert epics_holding(client, SAMPLE_ISSUE) == ["RT-102"]
+    assert [entry["epic_key"] for entry in client.serial_index[SAMPLE_SERIAL].values()] == ["RT-102"]
+    issue = next(task for task in client.epics["RT-102"].tasks if task.key == SAMPLE_ISSUE)
+    assert [change.to_status for change in issue.status_history] == ["Passed Initial Diagnosis"]
+    assert_matches_fresh_load(client, metadata)
+
+
+def test_relink_to_unloaded_epic_removes_issue(client, metadata):
+    payload = load_sample("jira_issue_updated_epic_link")
+    payload["issue"]["fields"]["customfield_10014"] = "RT-999"
+
+    assert replay(client, "jira_issue_created") == ["applied"]
+    assert client.apply_webhook_event(payload) == "applied"
+    assert epics_holding(client, SAMPLE_ISSUE) == []
+    assert SAMPLE_SERIAL not in client.serial_index
+    assert_matches_fresh_load(client, metadata)
+
+
+def test_deleted_issue(client, metadata):
+    assert replay(client, "jira_issue_created", "jira_issue_updated_epic_link", "jira_issue_deleted") == ["applied"] * 3
+
+    assert epics_holding(client, SAMPLE_ISSUE) == []
+    assert SAMPLE_SERIAL not in client.serial_index
+    assert_matches_fresh_load(client, metadata)
+
+
+def test_events_outside_loaded_epics(client, metadata):
+    assert replay(client, "comment_created", "jira_issue_deleted") == ["ignored"] * 2
+    assert client.apply_webhook_event({"webhookEvent": "sprint_started"}) == "unsupported"
+    assert_matches_fresh_load(client, metadata)
@@ -0,0 +1,117 @@
+import queue, threading
+
+
+#-----------------------------------------------------------------------------------------------------------
+# TimelineBroadcaster Class
+#-----------------------------------------------------------------------------------------------------------
+
+class TimelineSubscription:
+    """Events of one open stream, a stream that falls too far behind is told to reload instead of blocking the loads."""
+    MAX_PENDING = 100
+
+    def __init__(self, epic_key):
+        self.epic_key = epic_key
+        self.events = queue.Queue(maxsize=self.MAX_PENDING)
+        self.overflowed = False
+
+
+    def get(self, timeout):
+        #returns the next event, or None if nothing happened before the timeout
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class TimelineBroadcaster:
+    """
+    Pushes the changes of the per-day count timeline of an epic to its open streams.
+    Only epics with subscribers are tracked: the last published count timeline is kept per epic and every
+    publish sends the cells that changed, so a dashboard never refetches the whole timeline.
+    Every open stream holds a server thread, so at most MAX_SUBSCRIBERS streams are open at once.
+    """
+    MAX_SUBSCRIBERS = 100
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {} # epic key -> set of TimelineSubscription
+        self.timelines = {} # epic key -> last published count timeline
+        self.versions = {} # epic key -> number of events published
+
+
+    def has_subscribers(self, epic_key):
+        return bool(self.subscriptions.get(epic_key))
+
+
+    def subscribe(self, epic_key):
+        #returns None when MAX_SUBSCRIBERS streams are already open
+        subscription = TimelineSubscription(epic_key)
+        with self.lock:
+            if sum(len(subscriptions) for subscriptions in self.subscriptions.values()) >= self.MAX_SUBSCRIBERS:
+                return None
+            self.subscriptions.setdefault(epic_key, set()).add(subscription)
+        return subscription
+
+
+    def set_baseline(self, epic_key, timeline):
+        #the timeline a new stream starts from, kept only if no load published a newer one meanwhile
+        with self.lock:
+            self.timelines.setdefault(epic_key, timeline)
+            return self.versions.get(epic_key, 0)
+
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.epic_key, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.epic_key, None)
+                self.timelines.pop(subscription.epic_key, None)
+
+
+    def publish(self, epic_key, timeline, issues):
+        #sends the changed cells and issue status changes to every stream of the epic, nothing if neither changed
+        with self.lock:
+            subscriptions = self.subscriptions.get(epic_key)
+            if not subscriptions:
+                return
+
+            event = diff_timelines(self.timelines.get(epic_key), timeline)
+            if not event and not issues:
+                return
+            self.timelines[epic_key] = timeline
+            self.versions[epic_key] = self.versions.get(epic_key, 0) + 1
+            event.update({"rt": epic_key, "version": self.versions[epic_key], "issues": issues})
+
+            for subscription in subscriptions:
+                if subscription.overflowed:
+                    continue
+                try:
+                    subscription.events.put_nowait(event)
+                except queue.Full:
+                    subscription.overflowed = True
+
+
+def diff_timelines(old, new):
+    #returns the changed cells of a {day: {status: count}} timeline, plus the full day and status lists if they changed
+    old = old or {}
+    new = new or {}
+    event = {}
+
+    if list(old) != list(new):
+        event["days"] = list(new)
+    old_statuses = list(next(iter(old.values()), {}))
+    new_statuses = list(next(iter(new.values()), {}))
+    if old_statuses != new_statuses:
+        event["statuses"] = new_statuses
+
+    counts = {}
+    for day, day_counts in new.items():
+        old_counts = old.get(day, {})
+        changed = {status: count for status, count in day_counts.items() if old_counts.get(status) != count}
+        if changed:
+            counts[day] = changed
+    if counts:
+        event["counts"] = counts
+
+    return event
@@ -0,0 +1,248 @@
+import fcntl, json, os, sqlite3, threading, time
+from contextlib import contextmanager
+
+from helper import logger, full_rt
+
+
+#-----------------------------------------------------------------------------------------------------------
+# BoardWriteQueue Class
+#-----------------------------------------------------------------------------------------------------------
+
+class BoardWriteQueue:
+    """
+    Write-behind queue for the arc tester board writes.
+    Writes are journaled in a local SQLite database and replayed against Jira by a background worker,
+    so the tester gets an answer right away and nothing is lost on a 429, a network error or a restart.
+    Repeated writes for the same board are merged into one pending row, later values win. A write that keeps
+    failing is marked failed after max_attempts and stays in the journal, visible in get_status, until the
+    board is written again.
+    Every server worker can enqueue, but only the process holding the leader lock next to the database replays
+    the journal, so the same row is never sent to Jira by two workers. Another worker takes over if it exits.
+    """
+    KINDS = ("create", "update") # creates are replayed first, so updates can find the new issues
+
+    def __init__(self, client, db_path, poll_interval=1.0, max_backoff=900, max_not_found_attempts=5, max_attempts=10):
+        self.client = client
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.max_not_found_attempts = max_not_found_attempts
+        self.max_attempts = max_attempts
+        self.leader_poll_interval = 5.0
+        self.db_lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.worker = None
+        self.leader_file = None # kept open while this process replays the journal
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        with self.db_lock, self.connect() as db:
+            columns = [row[1] for row in db.execute("PRAGMA table_info(pending_writes)")]
+            if columns and "epic_key" not in columns:
+                db.execute("ALTER TABLE pending_writes RENAME TO pending_writes_v1")
+
+            # creates are per epic, the same board can be added to two orders. updates go to the newest
+            # issue of the serial whatever its epic, their epic_key is always ""
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS pending_writes (
+                    serial TEXT NOT NULL,
+                    epic_key TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    board_data TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt REAL NOT NULL,
+                    last_error TEXT,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (serial, epic_key, kind)
+                )
+            """)
+
+            if columns and "epic_key" not in columns:
+                # journals written before the epic key was part of the row key
+                for serial, kind, board_data, attempts, next_attempt, last_error, updated in db.execute(
+                    "SELECT serial, kind, board_data, attempts, next_attempt, last_error, updated FROM pending_writes_v1"
+                ).fetchall():
+                    db.execute("""
+                        INSERT OR REPLACE INTO pending_writes
+                            (serial, epic_key, kind, board_data, attempts, next_attempt, last_error, updated)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (serial, self.write_epic_key(kind, json.loads(board_data)), kind, board_data,
+                          attempts, next_attempt, last_error, updated))
+                db.execute("DROP TABLE pending_writes_v1")
+
+
+    @contextmanager
+    def connect(self):
+        #one short lived connection per call, committed on success and always closed
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+
+    def write_epic_key(self, kind, board_data):
+        epic_key = (board_data.get("epicKey") or "").strip()
+        return full_rt(epic_key) if kind == "create" and epic_key else ""
+
+
+    def start(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self.run, name="board-write-queue", daemon=True)
+            self.worker.start()
+            logger.info(f"Board write queue started with {self.pending_count()} pending writes from {self.db_path}")
+
+
+    def enqueue(self, kind, board_data):
+        #journals a write and returns immediately, merging it into any pending or failed write for the same board
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown write kind '{kind}'")
+
+        serial = board_data["serial"].strip()
+        epic_key = self.write_epic_key(kind, board_data)
+        now = time.time()
+
+        with self.db_lock, self.connect() as db:
+            row = db.execute(
+                "SELECT board_data FROM pending_writes WHERE serial = ? AND epic_key = ? AND kind = ?", (serial, epic_key, kind)
+            ).fetchone()
+            merged = json.loads(row[0]) if row else {}
+            merged.update(board_data)
+
+            db.execute("""
+                INSERT INTO pending_writes (serial, epic_key, kind, board_data, state, attempts, next_attempt, last_error, updated)
+                VALUES (?, ?, ?, ?, 'pending', 0, ?, NULL, ?)
+                ON CONFLICT (serial, epic_key, kind) DO UPDATE SET
+                    board_data = excluded.board_data, state = 'pending', attempts = 0,
+                    next_attempt = excluded.next_attempt, last_error = NULL, updated = excluded.updated
+            """, (serial, epic_key, kind, json.dumps(merged), now, now))
+
+        self.wake_event.set()
+
+
+    def pending_count(self):
+        with self.db_lock, self.connect() as db:
+            return db.execute("SELECT COUNT(*) FROM pending_writes WHERE state = 'pending'").fetchone()[0]
+
+
+    def get_status(self):
+        with self.db_lock, self.connect() as db:
+            rows = db.execute("""
+                SELECT serial, epic_key, kind, state, attempts, next_attempt, last_error
+                FROM pending_writes ORDER BY updated
+            """).fetchall()
+
+        return {
+            "pending": sum(row[3] == "pending" for row in rows),
+            "failed": sum(row[3] == "failed" for row in rows),
+            "writes": [
+                {"serial": serial, "epic_key": epic_key or None, "kind": kind, "state": state, "attempts": attempts,
+                 "next_attempt": next_attempt if state == "pending" else None, "last_error": last_error}
+                for serial, epic_key, kind, state, attempts, next_attempt, last_error in rows
+            ]
+        }
+
+
+    def acquire_leadership(self):
+        #blocks until this process holds the leader lock, the OS releases it when the holder exits
+        self.leader_file = open(self.db_path + ".lock", "a")
+        while True:
+            try:
+                fcntl.flock(self.leader_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                logger.info(f"Replaying the board write queue from process {os.getpid()}")
+                return
+            except BlockingIOError:
+                time.sleep(self.leader_poll_interval)
+
+
+    def run(self):
+        self.acquire_leadership()
+        while True:
+            try:
+                if not self.replay_due_writes():
+                    self.wake_event.wait(self.poll_interval)
+                    self.wake_event.clear()
+            except Exception as e:
+                logger.exception(f"Board write queue worker error: {e}")
+                time.sleep(self.poll_interval)
+
+
+    def replay_due_writes(self):
+        #sends every due write, creates in bulk calls and updates in batch calls. returns True if anything was sent
+        now = time.time()
+        with self.db_lock, self.connect() as db:
+            rows = db.execute("""
+                SELECT serial, epic_key, kind, board_data, attempts, updated FROM pending_writes
+                WHERE state = 'pending' AND next_attempt <= ?
+            """, (now,)).fetchall()
+
+        if not rows:
+            return False
+
+        for kind in self.KINDS:
+            due = [(serial, epic_key, json.loads(board_data), attempts, updated)
+                   for serial, epic_key, row_kind, board_data, attempts, updated in rows if row_kind == kind]
+
+            # the client answers per serial, a serial created in two epics is sent in two calls
+            for batch in serial_batches(due):
+                board_records = [board_data for _, _, board_data, _, _ in batch]
+                if kind == "create":
+                    results = self.client.create_issues_if_not_exist(board_records)
+                    results = {serial: result["result"] for serial, result in results.items()}
+                else:
+                    results = self.client.update_jira_with_board_data_batch(board_records)
+
+                for serial, epic_key, board_data, attempts, updated in batch:
+                    self.record_result(serial, epic_key, kind, results.get(serial, "error"), attempts, updated)
+
+        return True
+
+
+    def record_result(self, serial, epic_key, kind, result, attempts, updated):
+        # "failed" and "error" are retried with backoff up to max_attempts, then the write is marked failed,
+        # "not_found" gets a few attempts in case the issue is still being created, everything else is done
+        if result == "not_found":
+            retry = attempts + 1 < self.max_not_found_attempts
+        else:
+            retry = result in ("failed", "error")
+        give_up = retry and attempts + 1 >= self.max_attempts
+
+        # the "updated" check leaves a newer merged write alone, it gets replayed on its own schedule
+        key = (serial, epic_key, kind, updated)
+        with self.db_lock, self.connect() as db:
+            if give_up:
+                db.execute("""
+                    UPDATE pending_writes SET state = 'failed', attempts = ?, last_error = ?
+                    WHERE serial = ? AND epic_key = ? AND kind = ? AND updated = ?
+                """, (attempts + 1, result) + key)
+                logger.error(f"Board {kind} for {serial} failed {attempts + 1} times with '{result}', giving up until it is written again")
+            elif retry:
+                backoff = min(self.max_backoff, 2 ** (attempts + 1))
+                db.execute("""
+                    UPDATE pending_writes SET attempts = ?, next_attempt = ?, last_error = ?
+                    WHERE serial = ? AND epic_key = ? AND kind = ? AND updated = ?
+                """, (attempts + 1, time.time() + backoff, result) + key)
+                logger.warning(f"Board {kind} for {serial} returned '{result}', retrying in {backoff} seconds")
+            else:
+                db.execute(
+                    "DELETE FROM pending_writes WHERE serial = ? AND epic_key = ? AND kind = ? AND updated = ?", key
+                )
+                if result == "not_found":
+                    logger.warning(f"Dropping board {kind} for {serial}, no issue found after {attempts + 1} attempts")
+
+
+def serial_batches(writes):
+    #splits the writes into batches without a repeated serial, in order. the nth write of a serial goes in batch n
+    batches = []
+    seen = {} # serial -> writes of it so far
+    for write in writes:
+        index = seen.get(write[0], 0)
+        seen[write[0]] = index + 1
+        if index == len(batches):
+            batches.append([])
+        batches[index].append(write)
+    return batches